@@ -1,14 +1,26 @@
 import logging
 
-from aredis_om import Migrator
 from fastapi import FastAPI
 from fastapi.openapi.utils import get_openapi
 from starlette import status
 from starlette.middleware.cors import CORSMiddleware
-from starlette.responses import JSONResponse
+from starlette.responses import JSONResponse, PlainTextResponse
 
 from app.config import settings
-from app.crud.database import initialize_database
+from app.controller.admission_control import (
+    AdmissionControl,
+    AdmissionControlMiddleware,
+)
+from app.controller.schema_bootstrap import SchemaBootstrap
+from app.controller.upload_recovery import UploadRecovery
+from app.controller.upload_scheduler import upload_scheduler
+from app.crud.cache.upload_queue import UploadQueue
+from app.crud.cache.upload_signal import UploadSignal
+from app.crud.database import database
+from app.crud.storage import chunk_storage
+from app.utils.metrics_utils import render_metrics
+from app.utils.profiler_utils import ProfilingMiddleware
+from app.views.admin_view import admin_view
 from app.views.interrupt_view import interrupt_view
 
 
@@ -16,6 +28,8 @@ def create_app():
     fast_app = FastAPI(
         debug=settings.debug,
     )
+    # Added first so it runs inside CORS, and rejected uploads still carry the CORS headers.
+    fast_app.add_middleware(AdmissionControlMiddleware)
     fast_app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -23,6 +37,8 @@ def create_app():
         allow_methods=["*"],
         allow_headers=["*"],
     )
+    if settings.profiling_enabled:
+        fast_app.add_middleware(ProfilingMiddleware)
     return fast_app
 
 
@@ -51,6 +67,59 @@ async def health():
     )
 
 
+@app.get("/health/database_pool", tags=["Health"])
+async def database_pool_health():
+    return JSONResponse(
+        content={
+            "message": "Database connection pool statistics",
+            "status": "ok",
+            "data": database.pool_statistics(),
+        },
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@app.get("/health/upload_scheduler", tags=["Health"])
+async def upload_scheduler_health():
+    return JSONResponse(
+        content={
+            "message": "Upload scheduler statistics",
+            "status": "ok",
+            "data": upload_scheduler.statistics(),
+        },
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@app.get("/health/upload_queue", tags=["Health"])
+async def upload_queue_health():
+    return JSONResponse(
+        content={
+            "message": "Upload job stream statistics",
+            "status": "ok",
+            "data": await UploadQueue.statistics(),
+        },
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@app.get("/health/upload_admission", tags=["Health"])
+async def upload_admission_health():
+    return JSONResponse(
+        content={
+            "message": "Upload admission control statistics",
+            "status": "ok",
+            "data": AdmissionControl.statistics(),
+        },
+        status_code=status.HTTP_200_OK,
+    )
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 def custom_openapi_schema():
     if app.openapi_schema:
         return app.openapi_schema
@@ -72,10 +141,27 @@ def custom_openapi_schema():
 app.openapi = custom_openapi_schema
 
 app.include_router(interrupt_view)
+app.include_router(admin_view)
 
 
 @app.on_event("startup")
 async def startup_event():
     logging.info("Service is starting up!")
-    await initialize_database()
-    await Migrator().run()
+    await SchemaBootstrap.run()
+    UploadSignal.start_listener()
+    if settings.upload_executor == "stream":
+        # Chunks are written by `python -m app.worker` processes, which also redeliver orphaned jobs.
+        await UploadQueue.create_group()
+    else:
+        upload_scheduler.start()
+        UploadRecovery.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    logging.info("Service is shutting down!")
+    await UploadRecovery.stop()
+    await upload_scheduler.shutdown()
+    await UploadSignal.stop_listener()
+    await chunk_storage.close()
+    await database.engine.dispose()
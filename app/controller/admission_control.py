@@ -0,0 +1,131 @@
+from collections import Counter
+from typing import Optional
+
+from starlette import status
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.models.response.default_response_model import DefaultResponseModel
+from app.utils.metrics_utils import Gauge, uploads_rejected_total
+
+ADMITTED_PATHS: tuple[str, ...] = ("/interrupt/upload_file",)
+
+
+class AdmissionControl:
+    """Per-process budget of upload bytes being received, and of concurrent uploads per client.
+
+    Uploads reserve their declared ``Content-Length`` before any of the body is read and give it
+    back when the request finishes. A request that does not fit is rejected at once instead of
+    waiting, so a burst of large uploads cannot push back everyone else's requests.
+    """
+
+    inflight_bytes: int = 0
+    client_uploads: Counter[str] = Counter()
+
+    @classmethod
+    def admit(cls, client: str, content_length: int) -> Optional[str]:
+        """Reserve room for an upload, or return why it cannot be admitted."""
+        if content_length > settings.upload_max_file_size:
+            return "file_too_large"
+        if cls.client_uploads[client] >= settings.upload_max_uploads_per_client:
+            return "client_limit"
+        # A single upload larger than the whole budget is still let through when nothing else is in flight.
+        if cls.inflight_bytes and cls.inflight_bytes + content_length > settings.upload_inflight_byte_budget:
+            return "byte_budget"
+        cls.inflight_bytes += content_length
+        cls.client_uploads[client] += 1
+        return None
+
+    @classmethod
+    def release(cls, client: str, content_length: int) -> None:
+        cls.inflight_bytes -= content_length
+        cls.client_uploads[client] -= 1
+        if cls.client_uploads[client] <= 0:
+            del cls.client_uploads[client]
+
+    @classmethod
+    def statistics(cls) -> dict:
+        return {
+            "inflight_bytes": cls.inflight_bytes,
+            "inflight_byte_budget": settings.upload_inflight_byte_budget,
+            "clients": len(cls.client_uploads),
+            "uploads": sum(cls.client_uploads.values()),
+        }
+
+
+REJECTION_MESSAGES: dict[str, str] = {
+    "length_required": "Content-Length is required for uploads",
+    "file_too_large": "The upload exceeds the maximum file size",
+    "client_limit": "Too many uploads in progress from this client, please retry later",
+    "byte_budget": "Too many upload bytes in progress, please retry later",
+}
+REJECTION_STATUS_CODES: dict[str, int] = {
+    "length_required": status.HTTP_411_LENGTH_REQUIRED,
+    "file_too_large": status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    "client_limit": status.HTTP_429_TOO_MANY_REQUESTS,
+    "byte_budget": status.HTTP_429_TOO_MANY_REQUESTS,
+}
+
+
+def admission_rejected_response(reason: str) -> JSONResponse:
+    status_code: int = REJECTION_STATUS_CODES[reason]
+    headers: dict[str, str] = {}
+    if status_code == status.HTTP_429_TOO_MANY_REQUESTS:
+        headers["Retry-After"] = str(settings.upload_admission_retry_after)
+    return JSONResponse(
+        content=DefaultResponseModel(
+            message=REJECTION_MESSAGES[reason],
+            status="error",
+            status_code=status_code,
+        ).dict(exclude_none=True),
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def get_client(scope: Scope, headers: dict[bytes, bytes]) -> str:
+    if settings.upload_client_header:
+        client: Optional[bytes] = headers.get(settings.upload_client_header.lower().encode("latin-1"))
+        if client:
+            return client.decode("latin-1")
+    return scope["client"][0] if scope.get("client") else "unknown"
+
+
+class AdmissionControlMiddleware:
+    """Admits or rejects uploads from their headers, before the multipart body is read.
+
+    Plain ASGI, so nothing of a rejected body is received and the reservation of an admitted
+    upload is held until its response has been sent.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST" or scope["path"] not in ADMITTED_PATHS:
+            await self.app(scope, receive, send)
+            return
+        headers: dict[bytes, bytes] = dict(scope["headers"])
+        try:
+            content_length: int = int(headers[b"content-length"])
+        except (KeyError, ValueError):
+            await self.reject("length_required", scope, receive, send)
+            return
+        client: str = get_client(scope, headers)
+        reason: Optional[str] = AdmissionControl.admit(client, content_length)
+        if reason is not None:
+            await self.reject(reason, scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            AdmissionControl.release(client, content_length)
+
+    @staticmethod
+    async def reject(reason: str, scope: Scope, receive: Receive, send: Send) -> None:
+        uploads_rejected_total.inc(1, reason)
+        await admission_rejected_response(reason)(scope, receive, send)
+
+
+Gauge("upload_inflight_bytes", "Declared bytes of uploads being received", lambda: AdmissionControl.inflight_bytes)
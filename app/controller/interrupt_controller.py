@@ -1,6 +1,13 @@
 import asyncio
+import hashlib
 import logging
+import os
+import time
 import uuid
+from contextlib import aclosing
+from functools import partial
+from typing import AsyncGenerator, Optional
+from urllib.parse import quote
 
 from aredis_om import NotFoundError
 from fastapi import UploadFile
@@ -8,18 +15,40 @@ from redis import AuthenticationError
 from redis.exceptions import AuthorizationError
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import StreamingResponse
 
+from app.config import settings
+from app.controller.upload_progress import UploadProgress
+from app.controller.upload_scheduler import upload_scheduler
 from app.crud.cache.interrupt_cache import InterruptCache
+from app.crud.cache.upload_lease import UploadLease
+from app.crud.cache.upload_queue import UploadQueue
+from app.crud.cache.upload_signal import INTERRUPTING_STATUSES, UploadSignal
 from app.crud.database.interrupt_database import InterruptDatabase
 from app.exception.base_alchemy_exception import BaseAlchemyException
 from app.exception.base_redis_om_error import BaseRedisOmError
+from app.exception.invalid_status_transition_error import InvalidStatusTransitionError
+from app.exception.upload_scheduler_full_error import UploadSchedulerFullError
+from app.models.request.bulk_upload_request_model import BulkUploadRequestModel
 from app.models.response.default_response_model import DefaultResponseModel
 from app.redis.file_status_model import FileStatusModel
-
-# FILE_SIZE_LIMIT = 65000
-
-
-FILE_SIZE_LIMIT = 5
+from app.sql.file_content_model import FileUploadStatus
+from app.utils.codec_utils import encode_chunk
+from app.utils.function_utils import (
+    get_spool_path,
+    iter_chunk_batches,
+    iter_spool_chunks,
+    iter_upload_blocks,
+    parse_byte_range,
+    remove_spool_file,
+    remove_spool_files,
+)
+from app.utils.metrics_utils import (
+    time_stage,
+    upload_chunks_written_total,
+    uploads_total,
+)
 
 
 class InterruptController:
@@ -27,12 +56,19 @@ class InterruptController:
     async def upload_file(file: UploadFile) -> DefaultResponseModel:
         try:
             unique_id: str = uuid.uuid4().__str__()
-            content_bytes: bytes = await file.read()
-            content: str = content_bytes.decode("utf-8")
-            if len(content) < FILE_SIZE_LIMIT:
+            blocks = iter_upload_blocks(file, settings.upload_read_block_size)
+            head_blocks: list[bytes] = []
+            head_size: int = 0
+            async for block in blocks:
+                head_blocks.append(block)
+                head_size += len(block)
+                if head_size >= settings.upload_chunk_size:
+                    break
+            if head_size < settings.upload_chunk_size:
                 await InterruptDatabase.upload_file(
                     unique_id=unique_id,
-                    content=content,
+                    content=encode_chunk(b"".join(head_blocks)),
+                    chunk_length=head_size,
                     file_name=file.filename,
                     file_size="small",
                 )
@@ -41,12 +77,43 @@ class InterruptController:
                     status="success",
                     status_code=200,
                 )
-            chunks_range = [(i, i + FILE_SIZE_LIMIT) for i in range(0, len(content), FILE_SIZE_LIMIT)]
 
-            await InterruptCache.save_interrupt_cache(
-                unique_id=unique_id, chunk_range=chunks_range, file_name=file.filename, content=content
-            )
-            asyncio.create_task(InterruptController.upload_file_task(file.filename, unique_id, content, chunks_range))
+            if settings.upload_executor == "stream":
+                return await InterruptController.enqueue_upload(file.filename, unique_id, head_blocks, blocks)
+            # Shed load before spooling; a burst can still fill the queue meanwhile, which submit reports.
+            if upload_scheduler.is_saturated():
+                raise UploadSchedulerFullError("Too many uploads in progress, please retry later")
+            # Own the upload before it becomes visible in the cache, so recovery never sees it unleased.
+            lease_token: Optional[str] = await UploadLease.acquire(unique_id)
+            if lease_token is None:
+                # Only possible if the freshly generated id is already leased.
+                return InterruptController.upload_running_response(unique_id)
+            try:
+                spool_path: str = get_spool_path(unique_id)
+                content_length: int = await InterruptController.spool_upload(spool_path, head_blocks, blocks)
+                await InterruptCache.save_interrupt_cache(
+                    unique_id=unique_id, file_name=file.filename, spool_path=spool_path, content_length=content_length
+                )
+                try:
+                    upload_scheduler.submit(
+                        unique_id,
+                        lease_token,
+                        partial(
+                            InterruptController.upload_file_task,
+                            file.filename,
+                            unique_id,
+                            spool_path,
+                            lease_token,
+                            content_length,
+                        ),
+                    )
+                except UploadSchedulerFullError:
+                    await InterruptCache.delete_interrupt_cache(unique_id)
+                    await run_in_threadpool(remove_spool_file, unique_id)
+                    raise
+            except Exception:
+                await UploadLease.release(unique_id, lease_token)
+                raise
             return DefaultResponseModel(
                 message="File upload in progress please check status with unique id",
                 status="success",
@@ -57,53 +124,242 @@ class InterruptController:
             logging.error(base_alchemy_error)
             raise base_alchemy_error
 
+    @staticmethod
+    async def enqueue_upload(
+        filename: str,
+        unique_id: str,
+        head_blocks: list[bytes],
+        blocks: AsyncGenerator[bytes, None],
+    ) -> DefaultResponseModel:
+        """Spool a large upload and leave the chunk writing to ``python -m app.worker`` processes."""
+        spool_path: str = get_spool_path(unique_id)
+        content_length: int = await InterruptController.spool_upload(spool_path, head_blocks, blocks)
+        try:
+            await InterruptCache.save_interrupt_cache(
+                unique_id=unique_id, file_name=filename, spool_path=spool_path, content_length=content_length
+            )
+            await UploadQueue.enqueue(unique_id)
+        except Exception:
+            await InterruptCache.delete_interrupt_cache(unique_id)
+            await run_in_threadpool(remove_spool_file, unique_id)
+            raise
+        return DefaultResponseModel(
+            message="File upload in progress please check status with unique id",
+            status="success",
+            status_code=200,
+            data={"unique_id": unique_id},
+        )
+
+    @staticmethod
+    async def run_upload_job(unique_id: str) -> bool:
+        """Run a queued upload from its recorded cursor and return whether its job can be acknowledged.
+
+        The job is kept for redelivery while the upload is still ``uploading`` afterwards: another
+        worker holds it, or this one lost its lease or was asked to shut down before finishing.
+        """
+        try:
+            cached_data: FileStatusModel = await InterruptCache.get_interrupt_cache(unique_id)
+        except NotFoundError:
+            # Stopped or already completed.
+            return True
+        if cached_data.status in INTERRUPTING_STATUSES:
+            return True
+        if cached_data.spool_path is None:
+            logging.error(f"Upload {unique_id} has no staged content to resume from")
+            return True
+        lease_token: Optional[str] = await UploadLease.acquire(unique_id)
+        if lease_token is None:
+            return False
+        try:
+            # A previous delivery may have committed batches past the cursor before it died.
+            await InterruptDatabase.delete_file_chunks_from(unique_id, cached_data.chunk_cursor)
+        except Exception:
+            await UploadLease.release(unique_id, lease_token)
+            raise
+        await InterruptController.upload_file_task(
+            cached_data.file_name,
+            unique_id,
+            cached_data.spool_path,
+            lease_token,
+            cached_data.content_length,
+            cached_data.chunk_cursor,
+            cached_data.byte_cursor,
+        )
+        return await InterruptCache.get_interrupt_status(unique_id) != "uploading"
+
+    @staticmethod
+    async def spool_upload(
+        spool_path: str,
+        head_blocks: list[bytes],
+        blocks: AsyncGenerator[bytes, None],
+    ) -> int:
+        """Copy the rest of the upload to the local spool block by block and return its length in bytes."""
+        await run_in_threadpool(os.makedirs, os.path.dirname(spool_path), exist_ok=True)
+        spool_file = await run_in_threadpool(open, spool_path, "wb")
+        try:
+            content_length: int = 0
+            for block in head_blocks:
+                with time_stage("spool_write"):
+                    await run_in_threadpool(spool_file.write, block)
+                content_length += len(block)
+            async for block in blocks:
+                with time_stage("spool_write"):
+                    await run_in_threadpool(spool_file.write, block)
+                content_length += len(block)
+            return content_length
+        except Exception:
+            await run_in_threadpool(os.remove, spool_path)
+            raise
+        finally:
+            await run_in_threadpool(spool_file.close)
+
     @staticmethod
     async def upload_file_task(
         filename: str,
         unique_id: str,
-        content: str,
-        chunks_range: list[tuple[int, int]],
+        spool_path: str,
+        lease_token: str,
+        content_length: int,
+        chunk_cursor: int = 0,
+        byte_cursor: int = 0,
     ) -> None:
+        interrupted: asyncio.Event = UploadSignal.register(unique_id)
+        completed: bool = False
         try:
-            chunks_range_copy = chunks_range.copy()
-            for index, chunk_range in enumerate(chunks_range):
-                file_status_obj: FileStatusModel = await InterruptCache.get_interrupt_cache(unique_id)
+            # Registered before this check, so a kill published after it still sets the event.
+            if await InterruptCache.get_interrupt_status(unique_id) in (None, *INTERRUPTING_STATUSES):
+                return
+            progress = UploadProgress(chunk_cursor, byte_cursor)
+            batches: asyncio.Queue = asyncio.Queue(maxsize=settings.upload_writers_per_file)
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(settings.upload_writers_per_file):
+                    task_group.create_task(
+                        InterruptController.write_chunk_batches(filename, unique_id, batches, progress)
+                    )
+                spool_chunks = iter_spool_chunks(
+                    spool_path, settings.upload_chunk_size, byte_cursor, settings.upload_deduplicate_chunks
+                )
+                async with aclosing(spool_chunks):
+                    first_chunk_seq: int = chunk_cursor
+                    async for batch in iter_chunk_batches(
+                        spool_chunks, settings.upload_batch_size, settings.upload_batch_bytes
+                    ):
+                        if interrupted.is_set():
+                            break
+                        # Bounded queue: reading the spool never runs more than one batch per writer ahead.
+                        await batches.put((first_chunk_seq, batch))
+                        first_chunk_seq += len(batch)
+                for _ in range(settings.upload_writers_per_file):
+                    await batches.put(None)
 
-                if file_status_obj.status.value in ["killed", "stopped"]:
-                    break
+            finished: bool = progress.byte_cursor >= content_length
+            # A stop that lands after the last batch still wins, so it is not reported completed.
+            if finished and await InterruptCache.get_interrupt_status(unique_id) not in (None, "stopped"):
+                await InterruptDatabase.update_file_status(unique_id, "completed")
+                await InterruptCache.delete_interrupt_cache(unique_id)
+                await run_in_threadpool(remove_spool_file, unique_id)
+                completed = True
+                uploads_total.inc(1, "completed")
+            else:
+                uploads_total.inc(1, "interrupted")
 
-                chunk = content[chunk_range[0] : chunk_range[1]]
+        except asyncio.CancelledError:
+            uploads_total.inc(1, "interrupted")
+            raise
+        except Exception as exception:
+            # Writer errors arrive wrapped in the TaskGroup's ExceptionGroup.
+            uploads_total.inc(1, "failed")
+            logging.error(f"Upload {unique_id} failed: {exception!r}")
+            raise
+        finally:
+            UploadSignal.unregister(unique_id, interrupted)
+            await UploadLease.release(unique_id, lease_token)
+            if not completed:
+                await InterruptController.discard_stopped_upload(unique_id)
 
-                await InterruptDatabase.upload_file(
+    @staticmethod
+    async def discard_stopped_upload(unique_id: str) -> None:
+        """Delete the chunks of an upload that was stopped while this writer was still committing them.
+
+        A stop deletes the rows it finds without waiting for the writer, so a batch committed after
+        that delete would be left behind. Checked after the lease is released: either the stop's
+        delete came after every commit of this writer, or the stop is already visible here.
+        """
+        try:
+            upload_status: Optional[str] = await InterruptCache.get_interrupt_status(unique_id)
+            if upload_status is None:
+                # Also no longer cached once completed, by an earlier writer of the same upload.
+                file_summary = await InterruptDatabase.get_file_summary(unique_id)
+                if file_summary is None or file_summary.status == FileUploadStatus.COMPLETED:
+                    return
+            elif upload_status != "stopped":
+                return
+            await InterruptDatabase.delete_file_uploads([unique_id])
+        except Exception as exception:
+            # Never hide the outcome of the upload itself.
+            logging.error(f"Cleaning up stopped upload {unique_id} failed: {exception!r}")
+
+    @staticmethod
+    async def write_chunk_batches(
+        filename: str,
+        unique_id: str,
+        batches: asyncio.Queue,
+        progress: UploadProgress,
+    ) -> None:
+        while (item := await batches.get()) is not None:
+            first_chunk_seq, batch = item
+            # Compression and hashing release the GIL, so a thread keeps them off the event loop.
+            if settings.upload_deduplicate_chunks:
+                with time_stage("chunk_encode"):
+                    chunks = await run_in_threadpool(InterruptController.encode_deduplicated_chunks, batch)
+                await InterruptDatabase.upload_deduplicated_file_chunks(
                     unique_id=unique_id,
-                    content=chunk,
+                    first_chunk_seq=first_chunk_seq,
+                    chunks=chunks,
                     file_name=filename,
-                    file_size="large",
                 )
+            else:
+                with time_stage("chunk_encode"):
+                    chunks = await run_in_threadpool(InterruptController.encode_chunks, batch)
+                await InterruptDatabase.upload_file_chunks(
+                    unique_id=unique_id,
+                    first_chunk_seq=first_chunk_seq,
+                    chunks=chunks,
+                    file_name=filename,
+                )
+            upload_chunks_written_total.inc(len(batch))
+            end_byte: int = batch[-1][0] + len(batch[-1][1])
+            if progress.commit(first_chunk_seq, first_chunk_seq + len(batch), end_byte):
+                # The cursor is read under the lock, so a slower writer never stores an older value.
+                async with progress.lock:
+                    await InterruptCache.update_interrupt_chunk_cursor(
+                        unique_id, progress.chunk_cursor, progress.byte_cursor
+                    )
 
-                chunks_range_copy.remove(chunk_range)
-                await InterruptCache.update_interrupt_chunk_range(unique_id, chunks_range_copy)
-                # await sleep(10)
-
-            if len(chunks_range_copy) == 0:
-                await InterruptDatabase.update_file_status(unique_id, "completed")
-                await InterruptCache.delete_interrupt_cache(unique_id)
+    @staticmethod
+    def encode_chunks(batch: list[tuple[int, memoryview]]) -> list[tuple[int, int, bytes]]:
+        return [(byte_offset, len(chunk), encode_chunk(chunk)) for byte_offset, chunk in batch]
 
-        except BaseAlchemyException as base_alchemy_error:
-            logging.error(base_alchemy_error)
-            raise base_alchemy_error
+    @staticmethod
+    def encode_deduplicated_chunks(batch: list[tuple[int, memoryview]]) -> list[tuple[int, int, str, bytes]]:
+        # Hashes cover the original bytes, so identical chunks match whichever codec stored them first.
+        return [
+            (byte_offset, len(chunk), hashlib.sha256(chunk).hexdigest(), encode_chunk(chunk))
+            for byte_offset, chunk in batch
+        ]
 
     @staticmethod
     async def kill_file_upload(unique_id: str) -> DefaultResponseModel:
         try:
-            file_status_obj: FileStatusModel = await InterruptCache.get_interrupt_cache(unique_id)
-            if file_status_obj is not None:
-                await InterruptCache.update_interrupt_cache(unique_id, "killed")
-                return DefaultResponseModel(
-                    message="File upload killed successfully",
-                    status="success",
-                    status_code=200,
-                )
+            await InterruptCache.update_interrupt_cache(unique_id, "killed")
+            await UploadSignal.publish(unique_id, "killed")
+            return DefaultResponseModel(
+                message="File upload killed successfully",
+                status="success",
+                status_code=200,
+            )
+        except InvalidStatusTransitionError as invalid_transition_error:
+            return InterruptController.invalid_transition_response(unique_id, invalid_transition_error)
         except NotFoundError as not_found_error:
             logging.error(not_found_error)
             raise not_found_error
@@ -118,17 +374,26 @@ class InterruptController:
             raise base_redis_error
 
     @staticmethod
-    async def get_all_pending_file_upload() -> DefaultResponseModel:
+    async def get_all_pending_file_upload(
+        page_size: int,
+        cursor: Optional[str] = None,
+        file_name: Optional[str] = None,
+        older_than_seconds: Optional[float] = None,
+    ) -> DefaultResponseModel:
         try:
-            file_status_objs: list[FileStatusModel] = await InterruptCache.get_all_pending_file_upload()
-            upload_id: list[str] = []
-            for file_status_obj in file_status_objs:
-                upload_id.append(file_status_obj.unique_id)
+            created_before: Optional[float] = time.time() - older_than_seconds if older_than_seconds else None
+            uploads, next_cursor = await InterruptCache.get_all_pending_file_upload(
+                page_size=page_size, cursor=cursor, file_name=file_name, created_before=created_before
+            )
             return DefaultResponseModel(
                 message="Fetched all pending file uploads successfully",
                 status="success",
                 status_code=200,
-                data={"upload_id": upload_id},
+                data={
+                    "upload_id": [upload["unique_id"] for upload in uploads],
+                    "uploads": uploads,
+                    "next_cursor": next_cursor,
+                },
             )
         except (
             RedisTimeoutError,
@@ -143,16 +408,58 @@ class InterruptController:
     @staticmethod
     async def resume_upload(upload_id: str):
         try:
-            await InterruptCache.update_interrupt_cache(upload_id, "uploading")
             cached_date: FileStatusModel = await InterruptCache.get_interrupt_cache(upload_id)
-            asyncio.create_task(
-                InterruptController.upload_file_task(
-                    cached_date.file_name,
+            if cached_date.spool_path is None or not os.path.exists(cached_date.spool_path):
+                return DefaultResponseModel(
+                    message="The staged content of this file upload is no longer available",
+                    status="error",
+                    status_code=410,
+                    data={"upload_id": upload_id},
+                )
+            if settings.upload_executor == "stream":
+                # The worker that picks the job up takes the lease and trims rows past the cursor.
+                if not await UploadLease.get_unleased([upload_id]):
+                    return InterruptController.upload_running_response(upload_id)
+                try:
+                    await InterruptCache.update_interrupt_cache(upload_id, "uploading")
+                except InvalidStatusTransitionError as invalid_transition_error:
+                    return InterruptController.invalid_transition_response(upload_id, invalid_transition_error)
+                await UploadQueue.enqueue(upload_id)
+                return DefaultResponseModel(
+                    message="File upload resumed successfully",
+                    status="success",
+                    status_code=200,
+                    data={"upload_id": upload_id},
+                )
+            if upload_scheduler.is_saturated():
+                raise UploadSchedulerFullError("Too many uploads in progress, please retry later")
+            lease_token: Optional[str] = await UploadLease.acquire(upload_id)
+            if lease_token is None:
+                return InterruptController.upload_running_response(upload_id)
+            try:
+                await InterruptCache.update_interrupt_cache(upload_id, "uploading")
+                # Concurrent writers may have committed batches past the cursor before the upload stopped.
+                await InterruptDatabase.delete_file_chunks_from(upload_id, cached_date.chunk_cursor)
+                upload_scheduler.submit(
                     upload_id,
-                    cached_date.content,
-                    cached_date.chunk_range,
+                    lease_token,
+                    partial(
+                        InterruptController.upload_file_task,
+                        cached_date.file_name,
+                        upload_id,
+                        cached_date.spool_path,
+                        lease_token,
+                        cached_date.content_length,
+                        cached_date.chunk_cursor,
+                        cached_date.byte_cursor,
+                    ),
                 )
-            )
+            except InvalidStatusTransitionError as invalid_transition_error:
+                await UploadLease.release(upload_id, lease_token)
+                return InterruptController.invalid_transition_response(upload_id, invalid_transition_error)
+            except Exception:
+                await UploadLease.release(upload_id, lease_token)
+                raise
             return DefaultResponseModel(
                 message="File upload resumed successfully",
                 status="success",
@@ -169,12 +476,36 @@ class InterruptController:
             logging.error(base_redis_error)
             raise base_redis_error
 
+    @staticmethod
+    def upload_running_response(upload_id: str) -> DefaultResponseModel:
+        return DefaultResponseModel(
+            message="File upload is already running",
+            status="error",
+            status_code=409,
+            data={"upload_id": upload_id},
+        )
+
+    @staticmethod
+    def invalid_transition_response(
+        upload_id: str,
+        invalid_transition_error: InvalidStatusTransitionError,
+    ) -> DefaultResponseModel:
+        return DefaultResponseModel(
+            message=invalid_transition_error.args[0],
+            status="error",
+            status_code=409,
+            data={"upload_id": upload_id, "status": invalid_transition_error.current_status},
+        )
+
     @staticmethod
     async def stop_upload(upload_id: str):
         try:
             await InterruptCache.update_interrupt_cache(upload_id, "stopped")
-            await InterruptDatabase.delete_file_upload(upload_id)
+            await UploadSignal.publish(upload_id, "stopped")
+            # A writer still committing a batch deletes what it wrote after this itself, once it exits.
+            await InterruptDatabase.delete_file_uploads([upload_id])
             await InterruptCache.delete_interrupt_cache(upload_id)
+            await run_in_threadpool(remove_spool_file, upload_id)
             return DefaultResponseModel(
                 message="File upload stopped successfully",
                 status="success",
@@ -189,3 +520,319 @@ class InterruptController:
         ) as base_redis_error:
             logging.error(base_redis_error)
             raise base_redis_error
+
+    @staticmethod
+    async def select_bulk_uploads(request: BulkUploadRequestModel, statuses: tuple[str, ...]) -> list[str]:
+        """Return the ids a bulk request lists, or else the uploads in ``statuses`` that match its filter."""
+        if request.upload_ids is not None:
+            return list(dict.fromkeys(request.upload_ids))
+        created_before: Optional[float] = (
+            time.time() - request.older_than_seconds if request.older_than_seconds else None
+        )
+        unique_ids: list[str] = []
+        cursor: Optional[str] = None
+        while len(unique_ids) < settings.bulk_max_uploads:
+            uploads, cursor = await InterruptCache.get_all_pending_file_upload(
+                page_size=min(1000, settings.bulk_max_uploads - len(unique_ids)),
+                cursor=cursor,
+                file_name=request.file_name,
+                created_before=created_before,
+                statuses=statuses,
+            )
+            unique_ids.extend(upload["unique_id"] for upload in uploads)
+            if cursor is None:
+                break
+        return unique_ids
+
+    @staticmethod
+    def bulk_result(upload_id: str, status_code: int, message: str) -> dict:
+        return {"upload_id": upload_id, "status_code": status_code, "message": message}
+
+    @staticmethod
+    def bulk_transition_result(
+        upload_id: str,
+        transition: Optional[tuple[str, bool]],
+        status: str,
+        message: str,
+    ) -> dict:
+        if transition is None:
+            return InterruptController.bulk_result(upload_id, 404, "The file upload is either completed or not found")
+        current_status, applied = transition
+        if not applied:
+            return InterruptController.bulk_result(
+                upload_id, 409, InvalidStatusTransitionError(current_status, status).args[0]
+            )
+        return InterruptController.bulk_result(upload_id, 200, message)
+
+    @staticmethod
+    def bulk_response(action: str, results: list[dict]) -> DefaultResponseModel:
+        succeeded: int = sum(result["status_code"] == 200 for result in results)
+        return DefaultResponseModel(
+            message=f"{succeeded} of {len(results)} file uploads {action}",
+            status="success",
+            status_code=200,
+            data={"succeeded": succeeded, "failed": len(results) - succeeded, "results": results},
+        )
+
+    @staticmethod
+    async def bulk_kill_file_upload(request: BulkUploadRequestModel) -> DefaultResponseModel:
+        try:
+            unique_ids: list[str] = await InterruptController.select_bulk_uploads(request, ("uploading",))
+            transitions = await InterruptCache.update_interrupt_cache_many(unique_ids, "killed")
+            await UploadSignal.publish_many(
+                [unique_id for unique_id, transition in transitions.items() if transition and transition[1]], "killed"
+            )
+            return InterruptController.bulk_response(
+                "killed",
+                [
+                    InterruptController.bulk_transition_result(
+                        unique_id, transitions[unique_id], "killed", "File upload killed successfully"
+                    )
+                    for unique_id in unique_ids
+                ],
+            )
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def bulk_stop_upload(request: BulkUploadRequestModel) -> DefaultResponseModel:
+        try:
+            unique_ids: list[str] = await InterruptController.select_bulk_uploads(request, ("uploading", "killed"))
+            transitions = await InterruptCache.update_interrupt_cache_many(unique_ids, "stopped")
+            stopped: list[str] = [
+                unique_id for unique_id, transition in transitions.items() if transition and transition[1]
+            ]
+            await UploadSignal.publish_many(stopped, "stopped")
+            # Writers still committing a batch delete what they wrote after this themselves, once they exit.
+            await InterruptDatabase.delete_file_uploads(stopped)
+            await InterruptCache.delete_interrupt_cache_many(stopped)
+            await run_in_threadpool(remove_spool_files, stopped)
+            return InterruptController.bulk_response(
+                "stopped",
+                [
+                    InterruptController.bulk_transition_result(
+                        unique_id, transitions[unique_id], "stopped", "File upload stopped successfully"
+                    )
+                    for unique_id in unique_ids
+                ],
+            )
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def bulk_resume_upload(request: BulkUploadRequestModel) -> DefaultResponseModel:
+        try:
+            unique_ids: list[str] = await InterruptController.select_bulk_uploads(request, ("killed",))
+            cached_uploads = await InterruptCache.get_interrupt_cache_many(unique_ids)
+            results: dict[str, dict] = {}
+            candidates: list[str] = []
+            for unique_id in unique_ids:
+                if cached_uploads[unique_id] is None:
+                    results[unique_id] = InterruptController.bulk_result(
+                        unique_id, 404, "The file upload is either completed or not found"
+                    )
+                elif cached_uploads[unique_id].spool_path is None or not os.path.exists(
+                    cached_uploads[unique_id].spool_path
+                ):
+                    results[unique_id] = InterruptController.bulk_result(
+                        unique_id, 410, "The staged content of this file upload is no longer available"
+                    )
+                else:
+                    candidates.append(unique_id)
+
+            if settings.upload_executor == "stream":
+                unleased: set[str] = set(await UploadLease.get_unleased(candidates))
+                for unique_id in candidates:
+                    if unique_id not in unleased:
+                        results[unique_id] = InterruptController.bulk_result(
+                            unique_id, 409, "File upload is already running"
+                        )
+                candidates = [unique_id for unique_id in candidates if unique_id in unleased]
+                transitions = await InterruptCache.update_interrupt_cache_many(candidates, "uploading")
+                await UploadQueue.enqueue_many(
+                    [unique_id for unique_id, transition in transitions.items() if transition and transition[1]]
+                )
+                for unique_id, transition in transitions.items():
+                    results[unique_id] = InterruptController.bulk_transition_result(
+                        unique_id, transition, "uploading", "File upload resumed successfully"
+                    )
+                return InterruptController.bulk_response("resumed", [results[unique_id] for unique_id in unique_ids])
+
+            # Only take what the scheduler can queue right now; the rest is left untouched to retry.
+            free_slots: int = upload_scheduler.free_slots()
+            for unique_id in candidates[free_slots:]:
+                results[unique_id] = InterruptController.bulk_result(
+                    unique_id, 503, "Too many uploads in progress, please retry later"
+                )
+            leases: dict[str, Optional[str]] = await UploadLease.acquire_many(candidates[:free_slots])
+            leased: list[str] = []
+            for unique_id, lease_token in leases.items():
+                if lease_token is None:
+                    results[unique_id] = InterruptController.bulk_result(
+                        unique_id, 409, "File upload is already running"
+                    )
+                else:
+                    leased.append(unique_id)
+            try:
+                transitions = await InterruptCache.update_interrupt_cache_many(leased, "uploading")
+                resumed: list[str] = []
+                for unique_id, transition in transitions.items():
+                    results[unique_id] = InterruptController.bulk_transition_result(
+                        unique_id, transition, "uploading", "File upload resumed successfully"
+                    )
+                    if transition and transition[1]:
+                        resumed.append(unique_id)
+                    else:
+                        await UploadLease.release(unique_id, leases.pop(unique_id))
+                # Concurrent writers may have committed batches past the cursor before the uploads stopped.
+                await InterruptDatabase.delete_file_chunks_from_many(
+                    {unique_id: cached_uploads[unique_id].chunk_cursor for unique_id in resumed}
+                )
+            except Exception:
+                for unique_id, lease_token in leases.items():
+                    if lease_token is not None:
+                        await UploadLease.release(unique_id, lease_token)
+                raise
+            for unique_id in resumed:
+                cached_data: FileStatusModel = cached_uploads[unique_id]
+                try:
+                    upload_scheduler.submit(
+                        unique_id,
+                        leases[unique_id],
+                        partial(
+                            InterruptController.upload_file_task,
+                            cached_data.file_name,
+                            unique_id,
+                            cached_data.spool_path,
+                            leases[unique_id],
+                            cached_data.content_length,
+                            cached_data.chunk_cursor,
+                            cached_data.byte_cursor,
+                        ),
+                    )
+                except UploadSchedulerFullError as upload_scheduler_error:
+                    # Left as uploading without a lease, so the recovery sweeper picks it up later.
+                    await UploadLease.release(unique_id, leases[unique_id])
+                    results[unique_id] = InterruptController.bulk_result(unique_id, 503, upload_scheduler_error.args[0])
+            return InterruptController.bulk_response("resumed", [results[unique_id] for unique_id in unique_ids])
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def get_upload_status(upload_id: str) -> DefaultResponseModel:
+        try:
+            progress: Optional[dict] = await InterruptCache.get_interrupt_progress(upload_id)
+            if progress is not None:
+                upload_status, bytes_done, total_bytes = (
+                    progress["status"],
+                    progress["byte_cursor"],
+                    progress["content_length"],
+                )
+            else:
+                # Finished uploads are no longer cached; fall back to the stored file.
+                file_summary = await InterruptDatabase.get_file_summary(upload_id)
+                if file_summary is None:
+                    return DefaultResponseModel(
+                        message="File upload not found",
+                        status="error",
+                        status_code=404,
+                    )
+                upload_status, total_bytes = file_summary.status.value, file_summary.content_length
+                bytes_done = total_bytes if file_summary.status == FileUploadStatus.COMPLETED else 0
+            return DefaultResponseModel(
+                message="Fetched file upload status successfully",
+                status="success",
+                status_code=200,
+                data={
+                    "upload_id": upload_id,
+                    "status": upload_status,
+                    "bytes_done": bytes_done,
+                    "total_bytes": total_bytes,
+                    "percentage": round(bytes_done * 100 / total_bytes, 2) if total_bytes else 100.0,
+                },
+            )
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def download_file(upload_id: str, range_header: Optional[str]) -> StreamingResponse | DefaultResponseModel:
+        try:
+            file_summary = await InterruptDatabase.get_file_summary(upload_id)
+            if file_summary is None:
+                return DefaultResponseModel(
+                    message="File not found",
+                    status="error",
+                    status_code=404,
+                )
+            if file_summary.status != FileUploadStatus.COMPLETED:
+                return DefaultResponseModel(
+                    message="File upload is not completed yet",
+                    status="error",
+                    status_code=409,
+                    data={"upload_id": upload_id, "status": file_summary.status.value},
+                )
+            content_length: int = file_summary.content_length
+            headers: dict[str, str] = {
+                "Accept-Ranges": "bytes",
+                "Content-Disposition": f"attachment; filename*=UTF-8''{quote(file_summary.file_name)}",
+            }
+            byte_range: Optional[tuple[int, int]] = parse_byte_range(range_header, content_length)
+            start, end = byte_range if byte_range is not None else (0, content_length - 1)
+            headers["Content-Length"] = str(end - start + 1)
+            if byte_range is not None:
+                headers["Content-Range"] = f"bytes {start}-{end}/{content_length}"
+            return StreamingResponse(
+                InterruptController.stream_file(upload_id, start, end),
+                status_code=206 if byte_range is not None else 200,
+                media_type="text/plain; charset=utf-8",
+                headers=headers,
+            )
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    async def stream_file(upload_id: str, start: int, end: int) -> AsyncGenerator[bytes, None]:
+        """Yield the bytes ``start``..``end`` (inclusive) of a stored file, one chunk at a time."""
+        async with aclosing(InterruptDatabase.iter_file_chunks(upload_id, start)) as file_chunks:
+            async for byte_offset, content in file_chunks:
+                if byte_offset > end:
+                    break
+                yield content[max(start - byte_offset, 0) : end + 1 - byte_offset]
@@ -0,0 +1,31 @@
+import asyncio
+import logging
+
+from app.config import settings
+from app.crud.cache.search_index import SearchIndex
+from app.crud.database import get_schema_revision, initialize_database
+from app.utils.migration_utils import get_head_revision
+
+
+class SchemaBootstrap:
+    """Brings the Postgres schema and the RediSearch indexes up to date when a process starts.
+
+    With ``fast_start`` both are first checked with one query each, and the migrations only run
+    when one of them is behind. Migrations run under a lock, so when many workers boot at once
+    a single one migrates and the others wait for it and then skip.
+    """
+
+    @staticmethod
+    async def run() -> None:
+        if not settings.fast_start:
+            await initialize_database()
+            await SearchIndex.migrate()
+            return
+        revision, index_current = await asyncio.gather(get_schema_revision(), SearchIndex.is_current())
+        head: str = get_head_revision()
+        if head is None or revision != head:
+            logging.info(f"Database schema is at {revision}, migrating to {head or 'head'}")
+            await initialize_database()
+        if not index_current:
+            logging.info("Search indexes are out of date, migrating")
+            await SearchIndex.migrate()
@@ -0,0 +1,25 @@
+import asyncio
+
+
+class UploadProgress:
+    """Committed prefix of an upload whose batches may finish out of order.
+
+    Each batch covers consecutive chunks. The cursor only moves past a batch once every batch before
+    it has committed too, so everything before ``chunk_cursor``/``byte_cursor`` is durable however
+    the writers interleave.
+    """
+
+    def __init__(self, chunk_cursor: int, byte_cursor: int):
+        self.chunk_cursor: int = chunk_cursor
+        self.byte_cursor: int = byte_cursor
+        self.committed: dict[int, tuple[int, int]] = {}
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    def commit(self, first_chunk_seq: int, next_chunk_seq: int, end_byte: int) -> bool:
+        """Record a committed batch and return whether the contiguous cursor advanced."""
+        self.committed[first_chunk_seq] = (next_chunk_seq, end_byte)
+        advanced: bool = False
+        while self.chunk_cursor in self.committed:
+            self.chunk_cursor, self.byte_cursor = self.committed.pop(self.chunk_cursor)
+            advanced = True
+        return advanced
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import time
+from typing import Optional
+
+from aredis_om import NotFoundError
+
+from app.config import settings
+from app.controller.interrupt_controller import InterruptController
+from app.controller.upload_scheduler import upload_scheduler
+from app.crud.cache.interrupt_cache import InterruptCache
+from app.crud.cache.upload_lease import UploadLease
+from app.models.response.default_response_model import DefaultResponseModel
+
+RECOVERY_PAGE_SIZE = 100
+
+
+class UploadRecovery:
+    """Periodically resumes uploads left in ``uploading`` by a worker that died.
+
+    An upload whose lease has expired has no live writer. Reclaiming it goes through
+    ``InterruptController.resume_upload``, which takes the lease with ``SET NX``, so when several
+    workers sweep at once exactly one of them resumes each upload.
+
+    An upload that fails again without moving its cursor is retried with exponential backoff, and
+    after ``upload_recovery_max_attempts`` such resumes it is killed instead, so it waits for a manual
+    resume. Attempts are counted per process.
+    """
+
+    sweeper: Optional[asyncio.Task] = None
+    # Resumes without progress, the byte cursor at the last resume and when it happened, per upload.
+    attempts: dict[str, tuple[int, int, float]] = {}
+
+    @classmethod
+    def start(cls) -> None:
+        if cls.sweeper is None or cls.sweeper.done():
+            cls.sweeper = asyncio.create_task(cls.sweep_forever())
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls.sweeper is not None:
+            cls.sweeper.cancel()
+            try:
+                await cls.sweeper
+            except asyncio.CancelledError:
+                pass
+            cls.sweeper = None
+
+    @classmethod
+    async def sweep_forever(cls) -> None:
+        while True:
+            try:
+                reclaimed: int = await cls.sweep()
+                if reclaimed:
+                    logging.info(f"Reclaimed {reclaimed} orphaned uploads")
+            except Exception as exception:
+                logging.error(f"Upload recovery sweep failed: {exception}")
+            await asyncio.sleep(settings.upload_recovery_interval)
+
+    @staticmethod
+    async def sweep() -> int:
+        reclaimed: int = 0
+        cursor: Optional[str] = None
+        uploading: set[str] = set()
+        while True:
+            uploads, cursor = await InterruptCache.get_all_pending_file_upload(
+                page_size=RECOVERY_PAGE_SIZE, cursor=cursor, statuses=("uploading",)
+            )
+            uploading.update(upload["unique_id"] for upload in uploads)
+            for unique_id in await UploadLease.get_unleased([upload["unique_id"] for upload in uploads]):
+                if upload_scheduler.is_saturated():
+                    return reclaimed
+                if not await UploadRecovery.should_resume(unique_id):
+                    continue
+                response: DefaultResponseModel = await InterruptController.resume_upload(unique_id)
+                if response.status == "success":
+                    reclaimed += 1
+            if cursor is None:
+                # Completed, stopped and killed uploads are no longer retried.
+                for unique_id in UploadRecovery.attempts.keys() - uploading:
+                    del UploadRecovery.attempts[unique_id]
+                return reclaimed
+
+    @staticmethod
+    async def should_resume(unique_id: str) -> bool:
+        """Record a resume of an orphaned upload, or return False while it backs off or once it is killed."""
+        progress: Optional[dict] = await InterruptCache.get_interrupt_progress(unique_id)
+        if progress is None:
+            return False
+        attempts, byte_cursor, resumed_at = UploadRecovery.attempts.get(unique_id, (0, -1, 0.0))
+        if progress["byte_cursor"] != byte_cursor:
+            attempts = 0
+        if attempts >= settings.upload_recovery_max_attempts:
+            logging.error(f"Upload {unique_id} made no progress in {attempts} resumes, killing it")
+            del UploadRecovery.attempts[unique_id]
+            try:
+                await InterruptController.kill_file_upload(unique_id)
+            except NotFoundError:
+                pass
+            return False
+        if attempts and time.monotonic() - resumed_at < settings.upload_recovery_interval * 2 ** (attempts - 1):
+            return False
+        UploadRecovery.attempts[unique_id] = (attempts + 1, progress["byte_cursor"], time.monotonic())
+        return True
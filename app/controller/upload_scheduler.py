@@ -0,0 +1,132 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from app.config import settings
+from app.crud.cache.interrupt_cache import InterruptCache
+from app.crud.cache.upload_lease import UploadLease
+from app.crud.cache.upload_signal import UploadSignal
+from app.exception.upload_scheduler_full_error import UploadSchedulerFullError
+from app.utils.metrics_utils import Gauge
+from app.utils.profiler_utils import SamplingProfiler, profiled_request
+
+UploadJob = Callable[[], Awaitable[None]]
+
+
+class UploadScheduler:
+    """Runs large-file upload tasks on a fixed number of workers fed by a bounded queue.
+
+    ``submit`` never blocks: when the queue is full it raises ``UploadSchedulerFullError`` so the
+    caller can shed load. On shutdown queued and running uploads get ``drain_timeout`` seconds to
+    finish; whatever is left is checkpointed as killed so it can be resumed later. A job is queued with
+    the token of the lease its caller took, which checkpoint releases if the job never got to run.
+    """
+
+    def __init__(self, max_workers: int, max_queue: int, drain_timeout: float):
+        self.max_workers: int = max_workers
+        self.max_queue: int = max_queue
+        self.drain_timeout: float = drain_timeout
+        self.queue: Optional[asyncio.Queue] = None
+        self.workers: list[asyncio.Task] = []
+        self.active: set[str] = set()
+        self.accepting: bool = False
+
+    def start(self) -> None:
+        if self.workers:
+            return
+        self.queue = asyncio.Queue(maxsize=self.max_queue)
+        self.workers = [asyncio.create_task(self.worker()) for _ in range(self.max_workers)]
+        self.accepting = True
+
+    def is_saturated(self) -> bool:
+        return not self.accepting or self.queue is None or self.queue.full()
+
+    def free_slots(self) -> int:
+        if not self.accepting or self.queue is None:
+            return 0
+        return self.max_queue - self.queue.qsize()
+
+    def submit(self, unique_id: str, lease_token: str, job: UploadJob) -> None:
+        if not self.accepting:
+            raise UploadSchedulerFullError("Upload scheduler is shutting down")
+        if profiled_request.get() is not None:
+            # Submitted from a profiled request: profile the upload task it spawns as well.
+            job = SamplingProfiler.profiled(f"upload_file_task-{unique_id}", job)
+        try:
+            self.queue.put_nowait((unique_id, lease_token, job))
+        except asyncio.QueueFull:
+            raise UploadSchedulerFullError("Too many uploads in progress, please retry later")
+
+    async def worker(self) -> None:
+        while True:
+            unique_id, _, job = await self.queue.get()
+            self.active.add(unique_id)
+            try:
+                await job()
+            except Exception as exception:
+                logging.error(f"Upload {unique_id} failed: {exception}")
+            finally:
+                self.active.discard(unique_id)
+                self.queue.task_done()
+
+    def statistics(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "active_workers": len(self.active),
+            "max_queue": self.max_queue,
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "accepting": self.accepting,
+        }
+
+    async def shutdown(self) -> None:
+        if not self.workers:
+            return
+        self.accepting = False
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            await self.checkpoint()
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+
+    async def checkpoint(self) -> None:
+        """Mark every unfinished upload as killed and stop running ones at their next batch boundary."""
+        pending: list[str] = list(self.active)
+        dropped: dict[str, str] = {}
+        while not self.queue.empty():
+            unique_id, lease_token, _ = self.queue.get_nowait()
+            pending.append(unique_id)
+            dropped[unique_id] = lease_token
+            self.queue.task_done()
+        for unique_id in pending:
+            try:
+                await InterruptCache.update_interrupt_cache(unique_id, "killed")
+            except Exception as exception:
+                logging.error(f"Could not checkpoint upload {unique_id}: {exception}")
+            UploadSignal.notify(unique_id)
+        # Running jobs release their own lease; a dropped job never will, and its heartbeat would keep
+        # the upload from being resumed until this process exits.
+        for unique_id, lease_token in dropped.items():
+            await UploadLease.release(unique_id, lease_token)
+        logging.info(f"Checkpointed {len(pending)} unfinished uploads as killed")
+        # Running tasks commit their current batch and cursor before they see the signal.
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logging.error("Uploads did not stop in time, cancelling them")
+
+
+upload_scheduler: UploadScheduler = UploadScheduler(
+    max_workers=settings.upload_max_workers,
+    max_queue=settings.upload_max_queue,
+    drain_timeout=settings.upload_drain_timeout,
+)
+
+Gauge("uploads_active", "Uploads being written by a scheduler worker", lambda: len(upload_scheduler.active))
+Gauge(
+    "uploads_queued",
+    "Uploads waiting for a scheduler worker",
+    lambda: upload_scheduler.queue.qsize() if upload_scheduler.queue is not None else 0,
+)
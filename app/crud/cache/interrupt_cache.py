@@ -1,28 +1,86 @@
+import json
 import logging
+from typing import Optional
 
+from aredis_om import NotFoundError
+from aredis_om.model.token_escaper import TokenEscaper
+from redis.commands.search.query import Query
 from redis.exceptions import AuthenticationError, AuthorizationError
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
+from starlette.concurrency import run_in_threadpool
 
 from app.exception.base_redis_om_error import BaseRedisOmError
+from app.exception.invalid_status_transition_error import InvalidStatusTransitionError
 from app.redis.file_status_model import FileStatusModel
+from app.utils.function_utils import write_spool_file
+from app.utils.metrics_utils import observe_stage
+
+# Records written before uploads carried ``created_at`` get one at or just after the epoch, so they sort first.
+LEGACY_CREATED_AT = 0.0
+BACKFILL_BATCH_SIZE = 500
+
+
+def format_page_cursor(created_at: float, unique_ids: list[str]) -> str:
+    return f"{created_at!r}:{','.join(unique_ids)}"
+
+
+def parse_page_cursor(cursor: str) -> tuple[float, set[str]]:
+    """Split a page cursor into the ``created_at`` to resume from and the uploads already returned at it."""
+    created_at, _, unique_ids = cursor.partition(":")
+    return float(created_at), set(filter(None, unique_ids.split(",")))
+
+
+# Statuses an upload may move to, each with the statuses it may move from. A stopped upload is final.
+STATUS_TRANSITIONS: dict[str, tuple[str, ...]] = {
+    "uploading": ("uploading", "killed"),
+    "killed": ("uploading", "killed"),
+    "stopped": ("uploading", "killed", "stopped"),
+}
+
+# Sets $.status to ARGV[1] if the current status is one of ARGV[2..]. Returns {current status, applied}.
+TRANSITION_STATUS_SCRIPT = """
+local current = redis.call("JSON.GET", KEYS[1], "$.status")
+if not current then
+    return false
+end
+current = cjson.decode(current)[1]
+for index = 2, #ARGV do
+    if ARGV[index] == current then
+        redis.call("JSON.SET", KEYS[1], "$.status", cjson.encode(ARGV[1]))
+        return {current, 1}
+    end
+end
+return {current, 0}
+"""
+
+# Sets both cursors unless the upload has been deleted meanwhile, for example by a stop.
+UPDATE_CURSOR_SCRIPT = """
+if redis.call("EXISTS", KEYS[1]) == 0 then
+    return 0
+end
+redis.call("JSON.SET", KEYS[1], "$.chunk_cursor", ARGV[1])
+redis.call("JSON.SET", KEYS[1], "$.byte_cursor", ARGV[2])
+return 1
+"""
 
 
 class InterruptCache:
     @staticmethod
+    @observe_stage("cache_save")
     async def save_interrupt_cache(
         unique_id: str,
         file_name: str,
-        content: str,
-        chunk_range: list[tuple[int, int]],
+        spool_path: str,
+        content_length: int = 0,
     ) -> None:
         try:
             file_status_obj = FileStatusModel(
                 unique_id=unique_id,
                 file_name=file_name,
                 status="uploading",
-                content=content,
-                chunk_range=chunk_range,
+                spool_path=spool_path,
+                content_length=content_length,
             )
             await file_status_obj.save()
         except (
@@ -36,11 +94,56 @@ class InterruptCache:
             raise base_redis_error
 
     @staticmethod
-    async def update_interrupt_cache(unique_id: str, status: str) -> None:
+    @observe_stage("status_transition")
+    async def update_interrupt_cache(unique_id: str, status: str) -> str:
+        """Move an upload to ``status`` in one atomic round trip and return the status it had before.
+
+        Only the status field is written, so concurrent cursor updates are never lost. Raises
+        ``NotFoundError`` for an unknown upload and ``InvalidStatusTransitionError`` when
+        ``STATUS_TRANSITIONS`` does not allow the move.
+        """
         try:
-            file_status_obj = await FileStatusModel.get(unique_id)
-            file_status_obj.status = status
-            await file_status_obj.save()
+            transition_status = FileStatusModel.db().register_script(TRANSITION_STATUS_SCRIPT)
+            result: Optional[list] = await transition_status(
+                keys=[FileStatusModel.make_primary_key(unique_id)], args=[status, *STATUS_TRANSITIONS[status]]
+            )
+            if result is None:
+                raise NotFoundError(f"File upload {unique_id} not found")
+            current_status, applied = result
+            if not applied:
+                raise InvalidStatusTransitionError(current_status, status)
+            return current_status
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def update_interrupt_cache_many(unique_ids: list[str], status: str) -> dict[str, Optional[tuple[str, bool]]]:
+        """Apply ``update_interrupt_cache`` to many uploads in one pipelined round trip.
+
+        Returns, per upload, None when it does not exist, otherwise its previous status and whether
+        the transition was allowed.
+        """
+        try:
+            transition_status = FileStatusModel.db().register_script(TRANSITION_STATUS_SCRIPT)
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id in unique_ids:
+                    await transition_status(
+                        keys=[FileStatusModel.make_primary_key(unique_id)],
+                        args=[status, *STATUS_TRANSITIONS[status]],
+                        client=pipeline,
+                    )
+                results: list[Optional[list]] = await pipeline.execute()
+            return {
+                unique_id: (result[0], bool(result[1])) if result is not None else None
+                for unique_id, result in zip(unique_ids, results)
+            }
         except (
             RedisTimeoutError,
             AuthenticationError,
@@ -54,7 +157,173 @@ class InterruptCache:
     @staticmethod
     async def get_interrupt_cache(unique_id: str) -> FileStatusModel:
         try:
-            return await FileStatusModel.get(unique_id)
+            file_status: FileStatusModel = await FileStatusModel.get(unique_id)
+            if file_status.spool_path is None:
+                return await InterruptCache.restore_legacy_upload(file_status)
+            return file_status
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def get_interrupt_cache_many(unique_ids: list[str]) -> dict[str, Optional[FileStatusModel]]:
+        """Fetch many uploads in one pipelined round trip; missing ones map to None."""
+        try:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id in unique_ids:
+                    pipeline.json().get(FileStatusModel.make_primary_key(unique_id))
+                documents: list[Optional[dict]] = await pipeline.execute()
+            file_statuses: dict[str, Optional[FileStatusModel]] = {
+                unique_id: FileStatusModel.parse_obj(document) if document is not None else None
+                for unique_id, document in zip(unique_ids, documents)
+            }
+            for unique_id, file_status in file_statuses.items():
+                if file_status is not None and file_status.spool_path is None:
+                    file_statuses[unique_id] = await InterruptCache.restore_legacy_upload(file_status)
+            return file_statuses
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def restore_legacy_upload(file_status: FileStatusModel) -> FileStatusModel:
+        """Move the body of a record written before uploads were spooled into a spool file.
+
+        Such records hold the whole file as ``content`` text and the character ranges still to be
+        written as ``chunk_range``, all of the same width. The body is written out once, the cursors
+        are derived from the first remaining range, and both legacy fields are dropped. A record
+        without a body is returned unchanged, with no ``spool_path``, and cannot be resumed.
+        """
+        key: str = FileStatusModel.make_primary_key(file_status.unique_id)
+        try:
+            fields: Optional[dict[str, list]] = (
+                await FileStatusModel.db().json().get(key, "$.content", "$.chunk_range", "$.created_at")
+            )
+            if not fields or not fields["$.content"]:
+                return file_status
+            if not fields["$.created_at"]:
+                file_status.created_at = LEGACY_CREATED_AT
+            content: str = fields["$.content"][0]
+            chunk_range: list[list[int]] = (fields["$.chunk_range"] or [[]])[0]
+            committed: int = chunk_range[0][0] if chunk_range else len(content)
+            body: bytes = content.encode("utf-8")
+            file_status.spool_path = await run_in_threadpool(write_spool_file, file_status.unique_id, body)
+            file_status.content_length = len(body)
+            # With nothing left to write the width is unknown; every range held a character, so no chunk
+            # sequence reaches the length of the content.
+            file_status.chunk_cursor = (
+                committed // (chunk_range[0][1] - chunk_range[0][0]) if chunk_range else committed
+            )
+            file_status.byte_cursor = len(content[:committed].encode("utf-8"))
+            async with FileStatusModel.db().pipeline(transaction=True) as pipeline:
+                for field in ("spool_path", "content_length", "chunk_cursor", "byte_cursor", "created_at"):
+                    pipeline.json().set(key, f"$.{field}", getattr(file_status, field))
+                pipeline.json().delete(key, "$.content")
+                pipeline.json().delete(key, "$.chunk_range")
+                await pipeline.execute()
+            return file_status
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def backfill_created_at() -> int:
+        """Give every record written before uploads carried ``created_at`` one, and return how many were set.
+
+        Without the field a record is missing from the ``created_at`` index and cannot be paged. The
+        values are distinct and count up from ``LEGACY_CREATED_AT`` in scan order, so those records sort
+        before any newer upload and a page cursor never has to carry all of them.
+        """
+        backfilled: int = 0
+        keys: list[str] = []
+        try:
+            async for key in FileStatusModel.db().scan_iter(
+                match=FileStatusModel.make_primary_key("*"), count=BACKFILL_BATCH_SIZE, _type="ReJSON-RL"
+            ):
+                keys.append(key)
+                if len(keys) == BACKFILL_BATCH_SIZE:
+                    backfilled += await InterruptCache._backfill_created_at(keys, backfilled)
+                    keys = []
+            if keys:
+                backfilled += await InterruptCache._backfill_created_at(keys, backfilled)
+            return backfilled
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def _backfill_created_at(keys: list[str], backfilled: int) -> int:
+        async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+            for key in keys:
+                pipeline.json().get(key, "$.created_at")
+            created_at: list[Optional[list]] = await pipeline.execute()
+        missing: list[str] = [key for key, value in zip(keys, created_at) if not value]
+        if missing:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for position, key in enumerate(missing, start=backfilled):
+                    pipeline.json().set(key, "$.created_at", LEGACY_CREATED_AT + position)
+                await pipeline.execute()
+        return len(missing)
+
+    @staticmethod
+    @observe_stage("status_read")
+    async def get_interrupt_status(unique_id: str) -> Optional[str]:
+        """Read only the status field of an upload, or None when it is no longer cached."""
+        try:
+            status: Optional[list[str]] = (
+                await FileStatusModel.db().json().get(FileStatusModel.make_primary_key(unique_id), "$.status")
+            )
+            return status[0] if status else None
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def get_interrupt_progress(unique_id: str) -> Optional[dict]:
+        """Read the status and progress fields of an upload in one JSON.GET, without the rest of the document."""
+        try:
+            fields: Optional[dict[str, list]] = (
+                await FileStatusModel.db()
+                .json()
+                .get(FileStatusModel.make_primary_key(unique_id), "$.status", "$.content_length", "$.byte_cursor")
+            )
+            if not fields or not fields["$.status"]:
+                return None
+            return {
+                "status": fields["$.status"][0],
+                "content_length": (fields["$.content_length"] or [0])[0],
+                "byte_cursor": (fields["$.byte_cursor"] or [0])[0],
+            }
         except (
             RedisTimeoutError,
             AuthenticationError,
@@ -80,11 +349,12 @@ class InterruptCache:
             raise base_redis_error
 
     @staticmethod
-    async def update_interrupt_chunk_range(unique_id: str, chunk_range: list[tuple[int, int]]) -> None:
+    async def delete_interrupt_cache_many(unique_ids: list[str]) -> None:
         try:
-            file_status_obj = await FileStatusModel.get(unique_id)
-            file_status_obj.chunk_range = chunk_range
-            await file_status_obj.save()
+            if unique_ids:
+                await FileStatusModel.db().delete(
+                    *(FileStatusModel.make_primary_key(unique_id) for unique_id in unique_ids)
+                )
         except (
             RedisTimeoutError,
             AuthenticationError,
@@ -96,12 +366,83 @@ class InterruptCache:
             raise base_redis_error
 
     @staticmethod
-    async def get_all_pending_file_upload() -> list[FileStatusModel]:
+    @observe_stage("progress_write")
+    async def update_interrupt_chunk_cursor(unique_id: str, chunk_cursor: int, byte_cursor: int) -> None:
+        """Record that every chunk before ``chunk_cursor`` (ending at ``byte_cursor``) is committed."""
         try:
-            file_status_objects: list[FileStatusModel] = await FileStatusModel.find(
-                FileStatusModel.status == "killed"
-            ).all()
-            return file_status_objects
+            update_cursor = FileStatusModel.db().register_script(UPDATE_CURSOR_SCRIPT)
+            await update_cursor(
+                keys=[FileStatusModel.make_primary_key(unique_id)],
+                args=[json.dumps(chunk_cursor), json.dumps(byte_cursor)],
+            )
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def get_all_pending_file_upload(
+        page_size: int,
+        cursor: Optional[str] = None,
+        file_name: Optional[str] = None,
+        created_before: Optional[float] = None,
+        statuses: tuple[str, ...] = ("killed",),
+    ) -> tuple[list[dict], Optional[str]]:
+        """Return one page of uploads in any of ``statuses`` (killed by default), oldest first, and the next cursor.
+
+        Only the projected fields are returned by RediSearch, never whole documents. The cursor holds
+        the ``created_at`` of the last upload on the page and the ids returned with that exact value.
+        RediSearch sorts on one field only, so the next page starts at that ``created_at`` inclusively
+        and skips those ids; uploads sharing a timestamp across a page boundary are neither lost nor
+        repeated. Raises ``ValueError`` for a malformed cursor.
+        """
+        seen: set[str] = set()
+        if cursor is not None:
+            cursor_created_at, seen = parse_page_cursor(cursor)
+        try:
+            query: str = f"@status:{{{'|'.join(statuses)}}}"
+            if file_name:
+                query += f" @file_name:{{{TokenEscaper().escape(file_name)}}}"
+            if cursor is not None or created_before is not None:
+                lower: str = repr(cursor_created_at) if cursor is not None else "-inf"
+                upper: str = f"({created_before}" if created_before is not None else "+inf"
+                query += f" @created_at:[{lower} {upper}]"
+            result = (
+                await FileStatusModel.db()
+                .ft(FileStatusModel.Meta.index_name)
+                .search(
+                    Query(query)
+                    .return_fields("unique_id", "file_name", "created_at")
+                    .sort_by("created_at", asc=True)
+                    # Uploads already returned all sort first, so one extra row per seen id fills the page.
+                    .paging(0, page_size + len(seen))
+                )
+            )
+            uploads: list[dict] = [
+                {
+                    "unique_id": document.unique_id,
+                    "file_name": document.file_name,
+                    "created_at": float(getattr(document, "created_at", LEGACY_CREATED_AT)),
+                }
+                for document in result.docs
+                if document.unique_id not in seen
+            ]
+            has_more: bool = len(uploads) > page_size or result.total > len(result.docs)
+            uploads = uploads[:page_size]
+            if not uploads or not has_more:
+                return uploads, None
+            last_created_at: float = uploads[-1]["created_at"]
+            returned_at_last: list[str] = [
+                upload["unique_id"] for upload in uploads if upload["created_at"] == last_created_at
+            ]
+            if cursor is not None and last_created_at == cursor_created_at:
+                returned_at_last = sorted(seen) + returned_at_last
+            return uploads, format_page_cursor(last_created_at, returned_at_last)
         except (
             RedisTimeoutError,
             AuthenticationError,
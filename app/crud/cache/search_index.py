@@ -0,0 +1,67 @@
+import hashlib
+import logging
+
+from aredis_om import Migrator
+from aredis_om.model.migrations.migrator import schema_hash_key
+from aredis_om.model.model import model_registry
+from redis.exceptions import AuthenticationError, AuthorizationError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.crud.cache.interrupt_cache import InterruptCache
+from app.exception.base_redis_om_error import BaseRedisOmError
+from app.redis.file_status_model import FileStatusModel
+
+INDEX_MIGRATION_LOCK = "service_interrupt:index_migration"
+INDEX_MIGRATION_TIMEOUT = 60
+
+
+class SearchIndex:
+    """RediSearch indexes of the redis-om models, checked cheaply and migrated by one process at a time.
+
+    redis-om stores the SHA-1 of each index schema next to the index when it creates it. Comparing
+    those hashes with the current schemas in a single MGET tells whether ``Migrator`` has anything to do.
+    """
+
+    @staticmethod
+    async def is_current() -> bool:
+        expected: dict[str, str] = {}
+        for model in model_registry.values():
+            try:
+                schema: str = model.redisearch_schema()
+            except NotImplementedError:
+                continue
+            expected[schema_hash_key(model.Meta.index_name)] = hashlib.sha1(schema.encode("utf-8")).hexdigest()
+        if not expected:
+            return True
+        try:
+            stored: list = await FileStatusModel.db().mget(list(expected))
+            return stored == list(expected.values())
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def migrate() -> None:
+        try:
+            async with FileStatusModel.db().lock(INDEX_MIGRATION_LOCK, timeout=INDEX_MIGRATION_TIMEOUT):
+                await Migrator().run()
+                # Records that predate ``created_at`` are left out of its index until they hold one.
+                backfilled: int = await InterruptCache.backfill_created_at()
+                if backfilled:
+                    logging.info("Backfilled created_at of %d legacy uploads", backfilled)
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import socket
+import uuid
+from typing import Optional
+
+from redis.exceptions import AuthenticationError, AuthorizationError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.config import settings
+from app.crud.cache.upload_signal import UploadSignal
+from app.exception.base_redis_om_error import BaseRedisOmError
+from app.redis.file_status_model import FileStatusModel
+
+UPLOAD_LEASE_PREFIX = "service_interrupt:upload_lease:"
+
+RENEW_LEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+RELEASE_LEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+class UploadLease:
+    """Exclusive, expiring ownership of an upload, so exactly one writer runs it across all workers.
+
+    A lease is a Redis key holding the owner's token, created with ``SET NX PX``. While held, a
+    heartbeat renews it every third of ``upload_lease_ttl``. If a worker dies its lease simply
+    expires, and the upload becomes eligible for recovery. A holder that fails to renew, for example
+    after a long network partition, stops its writer instead of racing the new owner.
+    """
+
+    heartbeats: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def get_lease_key(unique_id: str) -> str:
+        return f"{UPLOAD_LEASE_PREFIX}{unique_id}"
+
+    @classmethod
+    async def acquire(cls, unique_id: str) -> Optional[str]:
+        """Take the lease and start its heartbeat; return the owner token, or None if it is already held."""
+        try:
+            token: str = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+            acquired: Optional[bool] = await FileStatusModel.db().set(
+                cls.get_lease_key(unique_id), token, nx=True, px=int(settings.upload_lease_ttl * 1000)
+            )
+            if not acquired:
+                return None
+            cls.heartbeats[unique_id] = asyncio.create_task(cls.heartbeat(unique_id, token))
+            return token
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @classmethod
+    async def acquire_many(cls, unique_ids: list[str]) -> dict[str, Optional[str]]:
+        """Like ``acquire`` for many uploads in one pipelined round trip."""
+        try:
+            tokens: list[str] = [f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}" for _ in unique_ids]
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id, token in zip(unique_ids, tokens):
+                    pipeline.set(cls.get_lease_key(unique_id), token, nx=True, px=int(settings.upload_lease_ttl * 1000))
+                acquired: list[Optional[bool]] = await pipeline.execute()
+            leases: dict[str, Optional[str]] = {}
+            for unique_id, token, is_acquired in zip(unique_ids, tokens, acquired):
+                leases[unique_id] = token if is_acquired else None
+                if is_acquired:
+                    cls.heartbeats[unique_id] = asyncio.create_task(cls.heartbeat(unique_id, token))
+            return leases
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @classmethod
+    async def release(cls, unique_id: str, token: str) -> None:
+        heartbeat: Optional[asyncio.Task] = cls.heartbeats.pop(unique_id, None)
+        if heartbeat is not None:
+            heartbeat.cancel()
+        try:
+            release_lease = FileStatusModel.db().register_script(RELEASE_LEASE_SCRIPT)
+            await release_lease(keys=[cls.get_lease_key(unique_id)], args=[token])
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            # The lease expires on its own; recovery only waits one TTL longer.
+            logging.error(base_redis_error)
+
+    @classmethod
+    async def heartbeat(cls, unique_id: str, token: str) -> None:
+        renew_lease = FileStatusModel.db().register_script(RENEW_LEASE_SCRIPT)
+        loop = asyncio.get_running_loop()
+        renewed_at: float = loop.time()
+        while True:
+            await asyncio.sleep(settings.upload_lease_ttl / 3)
+            try:
+                renewed: int = await renew_lease(
+                    keys=[cls.get_lease_key(unique_id)], args=[token, int(settings.upload_lease_ttl * 1000)]
+                )
+                if renewed:
+                    renewed_at = loop.time()
+            except (RedisTimeoutError, RedisConnectionError) as redis_error:
+                logging.error(f"Could not renew lease of upload {unique_id}: {redis_error}")
+                # Keep trying only while the lease is sure to outlive the next attempt.
+                renewed = int(loop.time() - renewed_at + settings.upload_lease_ttl / 3 < settings.upload_lease_ttl)
+            if not renewed:
+                logging.error(f"Lost lease of upload {unique_id}, stopping its writer")
+                cls.heartbeats.pop(unique_id, None)
+                UploadSignal.notify(unique_id)
+                return
+
+    @classmethod
+    async def get_unleased(cls, unique_ids: list[str]) -> list[str]:
+        """Return the uploads among ``unique_ids`` that nobody holds a lease on, in one round trip."""
+        try:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id in unique_ids:
+                    pipeline.exists(cls.get_lease_key(unique_id))
+                held: list[int] = await pipeline.execute()
+            return [unique_id for unique_id, is_held in zip(unique_ids, held) if not is_held]
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
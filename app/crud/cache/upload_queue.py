@@ -0,0 +1,224 @@
+import logging
+from typing import Optional
+
+from redis.exceptions import AuthenticationError, AuthorizationError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import ResponseError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.config import settings
+from app.exception.base_redis_om_error import BaseRedisOmError
+from app.redis.file_status_model import FileStatusModel
+
+
+class UploadQueue:
+    """Upload jobs on a Redis Stream, consumed by ``python -m app.worker`` processes through a consumer group.
+
+    A job is only the upload id; the worker reads everything else from the upload's cache record.
+    Delivery is at least once: a job stays pending until the worker that read it acknowledges it, and
+    jobs left pending by a dead worker are claimed by another one after ``upload_stream_claim_idle``.
+    The worker running a job keeps claiming it meanwhile, so only jobs whose worker is gone go idle.
+    Jobs delivered more than ``upload_stream_max_deliveries`` times are moved to the dead-letter stream.
+    """
+
+    @staticmethod
+    async def enqueue(unique_id: str) -> str:
+        try:
+            return await FileStatusModel.db().xadd(settings.upload_stream_name, {"unique_id": unique_id})
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def enqueue_many(unique_ids: list[str]) -> None:
+        try:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id in unique_ids:
+                    pipeline.xadd(settings.upload_stream_name, {"unique_id": unique_id})
+                await pipeline.execute()
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def create_group() -> None:
+        try:
+            await FileStatusModel.db().xgroup_create(
+                settings.upload_stream_name, settings.upload_stream_group, id="0", mkstream=True
+            )
+        except ResponseError as response_error:
+            if not str(response_error).startswith("BUSYGROUP"):
+                logging.error(response_error)
+                raise response_error
+
+    @staticmethod
+    async def read(consumer: str) -> Optional[tuple[str, str]]:
+        """Block up to ``upload_stream_block_timeout`` for one new job and return ``(job_id, unique_id)``."""
+        try:
+            streams: list = await FileStatusModel.db().xreadgroup(
+                settings.upload_stream_group,
+                consumer,
+                {settings.upload_stream_name: ">"},
+                count=1,
+                block=int(settings.upload_stream_block_timeout * 1000),
+            )
+            for _, messages in streams or []:
+                for job_id, fields in messages:
+                    return job_id, fields["unique_id"]
+            return None
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def claim_stale(consumer: str) -> Optional[tuple[str, str]]:
+        """Take over one job that another consumer read but has not acknowledged for too long.
+
+        Claimed with ``JUSTID``, so the delivery is not counted until ``redeliver`` decides to run it.
+        """
+        try:
+            job_ids: list[str] = await FileStatusModel.db().xautoclaim(
+                settings.upload_stream_name,
+                settings.upload_stream_group,
+                consumer,
+                min_idle_time=int(settings.upload_stream_claim_idle * 1000),
+                count=1,
+                justid=True,
+            )
+            for job_id in job_ids:
+                messages: list = await FileStatusModel.db().xrange(settings.upload_stream_name, job_id, job_id)
+                # Trimmed entries have no fields left; there is nothing to run for them.
+                if messages and messages[0][1]:
+                    return job_id, messages[0][1]["unique_id"]
+                await UploadQueue.acknowledge(job_id)
+            return None
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def redeliver(job_id: str, consumer: str) -> int:
+        """Count a new delivery of a claimed job and return how many times it has been delivered."""
+        try:
+            async with FileStatusModel.db().pipeline(transaction=True) as pipeline:
+                pipeline.xclaim(settings.upload_stream_name, settings.upload_stream_group, consumer, 0, [job_id])
+                pipeline.xpending_range(
+                    settings.upload_stream_name, settings.upload_stream_group, min=job_id, max=job_id, count=1
+                )
+                _, pending = await pipeline.execute()
+            return pending[0]["times_delivered"] if pending else 0
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def keep_claimed(job_id: str, consumer: str) -> None:
+        """Reset the idle time of a job being run, without counting a delivery, so nobody claims it meanwhile."""
+        try:
+            await FileStatusModel.db().xclaim(
+                settings.upload_stream_name, settings.upload_stream_group, consumer, 0, [job_id], justid=True
+            )
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def dead_letter(job_id: str, unique_id: str, deliveries: int) -> None:
+        """Move a job off the stream onto ``upload_stream_dead_letter_name``, where nothing consumes it."""
+        try:
+            async with FileStatusModel.db().pipeline(transaction=True) as pipeline:
+                pipeline.xadd(
+                    settings.upload_stream_dead_letter_name,
+                    {"unique_id": unique_id, "job_id": job_id, "deliveries": deliveries},
+                )
+                pipeline.xack(settings.upload_stream_name, settings.upload_stream_group, job_id)
+                pipeline.xdel(settings.upload_stream_name, job_id)
+                await pipeline.execute()
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def acknowledge(job_id: str) -> None:
+        try:
+            async with FileStatusModel.db().pipeline(transaction=True) as pipeline:
+                pipeline.xack(settings.upload_stream_name, settings.upload_stream_group, job_id)
+                pipeline.xdel(settings.upload_stream_name, job_id)
+                await pipeline.execute()
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def statistics() -> dict:
+        try:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                pipeline.xlen(settings.upload_stream_name)
+                pipeline.xpending(settings.upload_stream_name, settings.upload_stream_group)
+                pipeline.xlen(settings.upload_stream_dead_letter_name)
+                length, pending, dead_letters = await pipeline.execute()
+            return {
+                "stream": settings.upload_stream_name,
+                "group": settings.upload_stream_group,
+                "length": length,
+                "pending": pending["pending"],
+                "consumers": len(pending["consumers"]),
+                "dead_letters": dead_letters,
+            }
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
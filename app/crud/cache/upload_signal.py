@@ -0,0 +1,132 @@
+import asyncio
+import json
+import logging
+from typing import Optional
+
+from redis.exceptions import AuthenticationError, AuthorizationError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from redis.exceptions import RedisError
+from redis.exceptions import TimeoutError as RedisTimeoutError
+
+from app.crud.cache.interrupt_cache import InterruptCache
+from app.exception.base_redis_om_error import BaseRedisOmError
+from app.redis.file_status_model import FileStatusModel
+
+UPLOAD_SIGNAL_CHANNEL = "service_interrupt:upload_signal"
+UPLOAD_SIGNAL_RECONNECT_DELAY = 1.0
+UPLOAD_SIGNAL_MAX_RECONNECT_DELAY = 30.0
+INTERRUPTING_STATUSES = ("killed", "stopped")
+
+
+class UploadSignal:
+    """Cross-process kill/stop signalling for running upload tasks over Redis pub/sub.
+
+    Every process runs one subscriber on ``UPLOAD_SIGNAL_CHANNEL``. Upload tasks register an
+    ``asyncio.Event`` for their upload id and check it between batches instead of reading the
+    cache, so interrupting an upload costs one PUBLISH rather than a round trip per batch.
+    """
+
+    interrupted: dict[str, asyncio.Event] = {}
+    listener: Optional[asyncio.Task] = None
+
+    @staticmethod
+    async def publish(unique_id: str, status: str) -> None:
+        try:
+            await FileStatusModel.db().publish(
+                UPLOAD_SIGNAL_CHANNEL, json.dumps({"unique_id": unique_id, "status": status})
+            )
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @staticmethod
+    async def publish_many(unique_ids: list[str], status: str) -> None:
+        try:
+            async with FileStatusModel.db().pipeline(transaction=False) as pipeline:
+                for unique_id in unique_ids:
+                    pipeline.publish(UPLOAD_SIGNAL_CHANNEL, json.dumps({"unique_id": unique_id, "status": status}))
+                await pipeline.execute()
+        except (
+            RedisTimeoutError,
+            AuthenticationError,
+            AuthorizationError,
+            RedisConnectionError,
+            BaseRedisOmError,
+        ) as base_redis_error:
+            logging.error(base_redis_error)
+            raise base_redis_error
+
+    @classmethod
+    def register(cls, unique_id: str) -> asyncio.Event:
+        event = asyncio.Event()
+        cls.interrupted[unique_id] = event
+        return event
+
+    @classmethod
+    def unregister(cls, unique_id: str, event: asyncio.Event) -> None:
+        # A resumed task may already have registered a fresh event for the same upload.
+        if cls.interrupted.get(unique_id) is event:
+            del cls.interrupted[unique_id]
+
+    @classmethod
+    def start_listener(cls) -> None:
+        if cls.listener is None or cls.listener.done():
+            cls.listener = asyncio.create_task(cls.listen())
+
+    @classmethod
+    async def stop_listener(cls) -> None:
+        if cls.listener is not None:
+            cls.listener.cancel()
+            try:
+                await cls.listener
+            except asyncio.CancelledError:
+                pass
+            cls.listener = None
+
+    @classmethod
+    async def listen(cls) -> None:
+        reconnect_delay: float = UPLOAD_SIGNAL_RECONNECT_DELAY
+        while True:
+            pubsub = FileStatusModel.db().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(UPLOAD_SIGNAL_CHANNEL)
+                # Signals published while we were disconnected are lost, so re-check registered uploads.
+                await cls.resync()
+                reconnect_delay = UPLOAD_SIGNAL_RECONNECT_DELAY
+                async for message in pubsub.listen():
+                    cls.handle(message)
+            except (RedisError, BaseRedisOmError) as redis_error:
+                # Back off while Redis keeps failing; a subscription that got through resets the delay.
+                logging.error(f"Upload signal subscriber disconnected, retrying in {reconnect_delay}s: {redis_error}")
+                await asyncio.sleep(reconnect_delay)
+                reconnect_delay = min(reconnect_delay * 2, UPLOAD_SIGNAL_MAX_RECONNECT_DELAY)
+            finally:
+                await pubsub.reset()
+
+    @classmethod
+    def handle(cls, message: dict) -> None:
+        try:
+            payload: dict = json.loads(message["data"])
+            if payload.get("status") in INTERRUPTING_STATUSES:
+                cls.notify(payload["unique_id"])
+        except (ValueError, KeyError, AttributeError) as decode_error:
+            # One malformed message must not take down the subscriber of every upload in the process.
+            logging.error(f"Ignoring malformed upload signal {message.get('data')!r}: {decode_error}")
+
+    @classmethod
+    def notify(cls, unique_id: str) -> None:
+        event: Optional[asyncio.Event] = cls.interrupted.get(unique_id)
+        if event is not None:
+            event.set()
+
+    @classmethod
+    async def resync(cls) -> None:
+        for unique_id in list(cls.interrupted):
+            if await InterruptCache.get_interrupt_status(unique_id) in (None, *INTERRUPTING_STATUSES):
+                cls.notify(unique_id)
@@ -1,11 +1,11 @@
 import logging
+import time
 from asyncio import current_task
 from contextlib import asynccontextmanager
 from functools import wraps
 from typing import Generator, Optional
 
-from alembic import command
-from sqlalchemy import NullPool
+from sqlalchemy import AsyncAdaptedQueuePool, inspect, text
 from sqlalchemy.exc import (
     DatabaseError,
     OperationalError,
@@ -22,8 +22,42 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from app.config import settings
-from app.config.migration_config import config
 from app.sql.base import Base
+from app.utils.metrics_utils import Gauge
+
+# Postgres advisory lock key held while the schema is created and migrated.
+SCHEMA_MIGRATION_LOCK = 0x5E1F_0001
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait to acquire a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.acquire_count: int = 0
+        self.acquire_wait_total: float = 0.0
+        self.acquire_wait_max: float = 0.0
+
+    def connect(self):
+        started: float = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            waited: float = time.perf_counter() - started
+            self.acquire_count += 1
+            self.acquire_wait_total += waited
+            self.acquire_wait_max = max(self.acquire_wait_max, waited)
+
+    def statistics(self) -> dict:
+        return {
+            "pool_size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": self.overflow(),
+            "acquire_count": self.acquire_count,
+            "acquire_wait_avg_ms": (self.acquire_wait_total / self.acquire_count * 1000) if self.acquire_count else 0.0,
+            "acquire_wait_max_ms": self.acquire_wait_max * 1000,
+        }
 
 
 class PostgresSQL:
@@ -31,7 +65,12 @@ class PostgresSQL:
         self.connection_url: str = settings.database_url
         self.engine: AsyncEngine = create_async_engine(
             self.connection_url,
-            poolclass=NullPool,
+            poolclass=InstrumentedAsyncQueuePool,
+            pool_size=settings.database_pool_size,
+            max_overflow=settings.database_max_overflow,
+            pool_pre_ping=settings.database_pool_pre_ping,
+            pool_recycle=settings.database_pool_recycle,
+            pool_timeout=settings.database_pool_timeout,
             echo=settings.debug,
             future=True,
         )
@@ -47,9 +86,20 @@ class PostgresSQL:
             scopefunc=current_task,
         )
 
+    def pool_statistics(self) -> dict:
+        return self.engine.pool.statistics()
+
 
 database: PostgresSQL = PostgresSQL()
 
+Gauge("database_pool_checked_out", "Database connections in use", lambda: database.engine.pool.checkedout())
+# The pool counts overflow from -pool_size until the pool is full.
+Gauge(
+    "database_pool_overflow",
+    "Database connections open beyond the pool size",
+    lambda: max(database.engine.pool.overflow(), 0),
+)
+
 
 @asynccontextmanager
 async def get_session() -> Generator[async_scoped_session, None, None]:
@@ -74,18 +124,50 @@ def session(func):
     return wrapper
 
 
+async def get_schema_revision() -> Optional[str]:
+    try:
+        async with database.engine.connect() as connection:
+            return (await connection.execute(text("SELECT version_num FROM alembic_version"))).scalar()
+    except ProgrammingError:
+        return None
+
+
 async def initialize_database():
+    # Alembic is only needed when the schema is actually migrated, so it is not imported at startup.
+    from app.config.migration_config import config
+
     async with database.engine.begin() as database_connection:
         connection: AsyncConnection = database_connection
-        await connection.run_sync(Base.metadata.create_all)
-        await connection.run_sync(run_upgrade, config)
+        # Serializes workers booting together: the first migrates, the others then find the schema at head.
+        await connection.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SCHEMA_MIGRATION_LOCK})
+        if await connection.run_sync(is_empty_database):
+            # Nothing to migrate: create the current schema from the models and record it as head.
+            await connection.run_sync(Base.metadata.create_all)
+            await connection.run_sync(run_stamp, config)
+        else:
+            await connection.run_sync(run_upgrade, config)
+
+
+def is_empty_database(connection) -> bool:
+    return not set(Base.metadata.tables) & set(inspect(connection).get_table_names())
 
 
 def run_upgrade(connection, cfg):
+    from alembic import command
+
     cfg.attributes["connection"] = connection
     command.upgrade(cfg, "head")
 
 
+def run_stamp(connection, cfg):
+    from alembic import command
+
+    cfg.attributes["connection"] = connection
+    command.stamp(cfg, "head")
+
+
 def run_revision(connection, cfg):
+    from alembic import command
+
     cfg.attributes["connection"] = connection
     command.revision(cfg, autogenerate=True)
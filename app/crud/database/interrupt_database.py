@@ -1,32 +1,68 @@
 import logging
-from typing import Literal
+from collections import Counter
+from typing import AsyncGenerator, Iterable, Literal, Optional
 
-from sqlalchemy import String, cast, delete, update
+from sqlalchemy import (
+    BigInteger,
+    Row,
+    Uuid,
+    any_,
+    bindparam,
+    delete,
+    func,
+    select,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import async_scoped_session
+from starlette.concurrency import run_in_threadpool
 
-from app.crud.database import session
+from app.config import settings
+from app.crud.database import get_session, session
+from app.crud.storage import chunk_storage
 from app.exception.base_alchemy_exception import BaseAlchemyException
+from app.sql.chunk_store_model import ChunkStoreModel
 from app.sql.file_content_model import FileContentModel, FileUploadStatus
+from app.utils.codec_utils import decode_chunk
+from app.utils.metrics_utils import observe_stage
 
 INTERMEDIATE_STATUS = {"large": FileUploadStatus.UPLOADING, "small": FileUploadStatus.COMPLETED}
 
+FILE_ID_ARRAY = ARRAY(Uuid(as_uuid=False))
+
+# The stored body of a chunk, whether it is inline or deduplicated into chunk_store. NULL when the
+# chunk storage engine keeps it elsewhere.
+CHUNK_CONTENT = func.coalesce(FileContentModel.content, ChunkStoreModel.content)
+
+# What deletes return, for the chunk store and the chunk storage engine to release what the rows held.
+DELETED_CHUNK_COLUMNS = (
+    FileContentModel.file_id,
+    FileContentModel.chunk_seq,
+    FileContentModel.content_hash,
+    FileContentModel.storage_segment,
+)
+
 
 class InterruptDatabase:
     @staticmethod
+    @observe_stage("db_insert")
     @session
     async def upload_file(
         async_session,
         unique_id: str,
-        content: str,
+        content: bytes,
+        chunk_length: int,
         file_name: str,
         file_size: Literal["large", "small"],
     ) -> None:
         try:
+            location: dict = (await chunk_storage.write_chunks(unique_id, 0, [content]))[0]
             file_object = FileContentModel(
                 file_id=unique_id,
                 file_name=file_name,
-                content=content,
+                chunk_length=chunk_length,
                 status=INTERMEDIATE_STATUS[file_size],
+                **location,
             )
             async_session.add(file_object)
             await async_session.commit()
@@ -35,6 +71,181 @@ class InterruptDatabase:
             raise base_alchemy_error
 
     @staticmethod
+    @observe_stage("db_insert")
+    @session
+    async def upload_file_chunks(
+        async_session: async_scoped_session,
+        unique_id: str,
+        first_chunk_seq: int,
+        chunks: list[tuple[int, int, bytes]],
+        file_name: str,
+    ) -> None:
+        """Insert consecutive ``(byte_offset, chunk_length, content)`` chunks, numbered from ``first_chunk_seq``.
+
+        Bodies go to the configured chunk storage first, so a committed row never points at a missing body.
+        Chunks that already exist are left alone, so a batch replayed after a redelivered job is a no-op.
+        """
+        try:
+            if not chunks:
+                return
+            locations: list[dict] = await chunk_storage.write_chunks(
+                unique_id, first_chunk_seq, [content for _, _, content in chunks]
+            )
+            await async_session.execute(
+                insert(FileContentModel).on_conflict_do_nothing(index_elements=["file_id", "chunk_seq"]),
+                [
+                    {
+                        "file_id": unique_id,
+                        "chunk_seq": first_chunk_seq + index,
+                        "byte_offset": byte_offset,
+                        "chunk_length": chunk_length,
+                        "file_name": file_name,
+                        "status": INTERMEDIATE_STATUS["large"],
+                        **location,
+                    }
+                    for index, ((byte_offset, chunk_length, _), location) in enumerate(zip(chunks, locations))
+                ],
+            )
+            await async_session.commit()
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    @observe_stage("db_insert")
+    @session
+    async def upload_deduplicated_file_chunks(
+        async_session: async_scoped_session,
+        unique_id: str,
+        first_chunk_seq: int,
+        chunks: list[tuple[int, int, str, bytes]],
+        file_name: str,
+    ) -> None:
+        """Insert ``(byte_offset, chunk_length, content_hash, content)`` chunks as references into the chunk store.
+
+        Deduplicated bodies always live in Postgres, whichever chunk storage is configured.
+        Only bodies the store does not hold yet are sent. Reference counts grow by the rows this call
+        actually inserted, so a replayed batch changes nothing. Store rows are locked in hash order,
+        which keeps concurrent uploads of overlapping content from deadlocking.
+        """
+        try:
+            if not chunks:
+                return
+            inserted = await async_session.execute(
+                insert(FileContentModel)
+                .on_conflict_do_nothing(index_elements=["file_id", "chunk_seq"])
+                .returning(FileContentModel.content_hash),
+                [
+                    {
+                        "file_id": unique_id,
+                        "chunk_seq": first_chunk_seq + index,
+                        "byte_offset": byte_offset,
+                        "chunk_length": chunk_length,
+                        "file_name": file_name,
+                        "content_hash": content_hash,
+                        "status": INTERMEDIATE_STATUS["large"],
+                    }
+                    for index, (byte_offset, chunk_length, content_hash, _) in enumerate(chunks)
+                ],
+            )
+            references: Counter[str] = Counter(inserted.scalars())
+            if references:
+                chunk_store = ChunkStoreModel.__table__
+                content_hashes: list[str] = sorted(references)
+                stored: set[str] = set(
+                    (
+                        await async_session.execute(
+                            select(chunk_store.c.content_hash)
+                            .where(chunk_store.c.content_hash.in_(content_hashes))
+                            .order_by(chunk_store.c.content_hash)
+                            .with_for_update()
+                        )
+                    ).scalars()
+                )
+                if stored:
+                    await async_session.execute(
+                        update(chunk_store)
+                        .where(chunk_store.c.content_hash == bindparam("stored_hash"))
+                        .values(ref_count=chunk_store.c.ref_count + bindparam("references")),
+                        [
+                            {"stored_hash": content_hash, "references": references[content_hash]}
+                            for content_hash in sorted(stored)
+                        ],
+                    )
+                contents: dict[str, bytes] = {content_hash: content for _, _, content_hash, content in chunks}
+                missing: list[str] = [content_hash for content_hash in content_hashes if content_hash not in stored]
+                if missing:
+                    # Another upload may store the same body first; then this only adds our references.
+                    statement = insert(chunk_store)
+                    await async_session.execute(
+                        statement.on_conflict_do_update(
+                            index_elements=["content_hash"],
+                            set_={"ref_count": chunk_store.c.ref_count + statement.excluded.ref_count},
+                        ),
+                        [
+                            {
+                                "content_hash": content_hash,
+                                "content": contents[content_hash],
+                                "ref_count": references[content_hash],
+                            }
+                            for content_hash in missing
+                        ],
+                    )
+            await async_session.commit()
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    async def release_chunk_references(
+        async_session: async_scoped_session,
+        content_hashes: Iterable[Optional[str]],
+    ) -> None:
+        """Drop one reference per hash from the chunk store and delete bodies nothing refers to any more."""
+        references: Counter[str] = Counter(content_hash for content_hash in content_hashes if content_hash)
+        if not references:
+            return
+        chunk_store = ChunkStoreModel.__table__
+        await async_session.execute(
+            select(chunk_store.c.content_hash)
+            .where(chunk_store.c.content_hash.in_(list(references)))
+            .order_by(chunk_store.c.content_hash)
+            .with_for_update()
+        )
+        await async_session.execute(
+            update(chunk_store)
+            .where(chunk_store.c.content_hash == bindparam("stored_hash"))
+            .values(ref_count=chunk_store.c.ref_count - bindparam("references")),
+            [{"stored_hash": content_hash, "references": count} for content_hash, count in sorted(references.items())],
+        )
+        await async_session.execute(
+            delete(chunk_store).where(
+                chunk_store.c.content_hash.in_(list(references)),
+                chunk_store.c.ref_count <= 0,
+            )
+        )
+
+    @staticmethod
+    async def release_stored_chunks(async_session: async_scoped_session, deleted: list[Row]) -> None:
+        """Tell the chunk storage which rows are gone, then delete the segments no row points to any more."""
+        chunk_storage.delete_chunks(deleted)
+        segment_names: list[str] = await run_in_threadpool(chunk_storage.get_reclaimable_segments)
+        if not segment_names:
+            return
+        live_segments: set[str] = set(
+            await async_session.scalars(
+                select(FileContentModel.storage_segment)
+                .where(FileContentModel.storage_segment.in_(segment_names))
+                .distinct()
+            )
+        )
+        await run_in_threadpool(
+            chunk_storage.delete_segments,
+            [segment_name for segment_name in segment_names if segment_name not in live_segments],
+        )
+
+    @staticmethod
+    @observe_stage("db_update_status")
     @session
     async def update_file_status(
         async_session: async_scoped_session,
@@ -51,7 +262,7 @@ class InterruptDatabase:
                 file_status = FileUploadStatus.UPLOADING
             statement = (
                 update(FileContentModel)
-                .where(cast(FileContentModel.file_id, String) == unique_id)
+                .where(FileContentModel.file_id == unique_id)
                 .values(
                     {
                         FileContentModel.status: file_status,
@@ -66,14 +277,155 @@ class InterruptDatabase:
 
     @staticmethod
     @session
-    async def delete_file_upload(
+    async def delete_file_uploads(
+        async_session: async_scoped_session,
+        unique_ids: list[str],
+    ) -> None:
+        """Delete every chunk of the given uploads with one statement."""
+        try:
+            if not unique_ids:
+                return
+            statement = (
+                delete(FileContentModel)
+                .where(FileContentModel.file_id == any_(bindparam("file_ids", unique_ids, type_=FILE_ID_ARRAY)))
+                .returning(*DELETED_CHUNK_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            deleted: list[Row] = (await async_session.execute(statement)).all()
+            await InterruptDatabase.release_chunk_references(async_session, (chunk.content_hash for chunk in deleted))
+            await async_session.commit()
+            await InterruptDatabase.release_stored_chunks(async_session, deleted)
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    @session
+    async def delete_file_chunks_from(
         async_session: async_scoped_session,
         unique_id: str,
+        chunk_seq: int,
     ) -> None:
+        """Delete chunks at or after ``chunk_seq``, left behind by writers that finished out of order."""
         try:
-            statement = delete(FileContentModel).where(cast(FileContentModel.file_id, String) == unique_id)
-            await async_session.execute(statement)
+            statement = (
+                delete(FileContentModel)
+                .where(
+                    FileContentModel.file_id == unique_id,
+                    FileContentModel.chunk_seq >= chunk_seq,
+                )
+                .returning(*DELETED_CHUNK_COLUMNS)
+            )
+            deleted: list[Row] = (await async_session.execute(statement)).all()
+            await InterruptDatabase.release_chunk_references(async_session, (chunk.content_hash for chunk in deleted))
             await async_session.commit()
+            await InterruptDatabase.release_stored_chunks(async_session, deleted)
         except BaseAlchemyException as base_alchemy_error:
             logging.error(base_alchemy_error)
             raise base_alchemy_error
+
+    @staticmethod
+    @session
+    async def delete_file_chunks_from_many(
+        async_session: async_scoped_session,
+        chunk_cursors: dict[str, int],
+    ) -> None:
+        """Like ``delete_file_chunks_from`` for many uploads, each from its own cursor, in one statement."""
+        try:
+            if not chunk_cursors:
+                return
+            cursors = (
+                func.unnest(
+                    bindparam("file_ids", list(chunk_cursors), type_=FILE_ID_ARRAY),
+                    bindparam("chunk_seqs", list(chunk_cursors.values()), type_=ARRAY(BigInteger)),
+                )
+                .table_valued("file_id", "chunk_seq")
+                .render_derived()
+            )
+            statement = (
+                delete(FileContentModel)
+                .where(
+                    FileContentModel.file_id == cursors.c.file_id,
+                    FileContentModel.chunk_seq >= cursors.c.chunk_seq,
+                )
+                .returning(*DELETED_CHUNK_COLUMNS)
+                .execution_options(synchronize_session=False)
+            )
+            deleted: list[Row] = (await async_session.execute(statement)).all()
+            await InterruptDatabase.release_chunk_references(async_session, (chunk.content_hash for chunk in deleted))
+            await async_session.commit()
+            await InterruptDatabase.release_stored_chunks(async_session, deleted)
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    @session
+    async def get_file_summary(
+        async_session: async_scoped_session,
+        unique_id: str,
+    ) -> Optional[Row]:
+        """Return ``file_name``, ``status`` and ``content_length`` of a stored file, read from its last chunk."""
+        try:
+            statement = (
+                select(
+                    FileContentModel.file_name,
+                    FileContentModel.status,
+                    (FileContentModel.byte_offset + FileContentModel.chunk_length).label("content_length"),
+                )
+                .where(FileContentModel.file_id == unique_id)
+                .order_by(FileContentModel.chunk_seq.desc())
+                .limit(1)
+            )
+            return (await async_session.execute(statement)).first()
+        except BaseAlchemyException as base_alchemy_error:
+            logging.error(base_alchemy_error)
+            raise base_alchemy_error
+
+    @staticmethod
+    async def iter_file_chunks(unique_id: str, start: int = 0) -> AsyncGenerator[tuple[int, bytes], None]:
+        """Stream ``(byte_offset, content)`` of a file in order, from the chunk containing byte ``start``.
+
+        Rows come from a server-side cursor ``download_fetch_size`` at a time, so memory does not
+        grow with the file. Each batch of bodies is read from the chunk storage and decoded, whatever
+        codec they were stored with, in a thread.
+        """
+        async with get_session() as async_session:
+            try:
+                first_chunk_seq = (
+                    select(FileContentModel.chunk_seq)
+                    .where(FileContentModel.file_id == unique_id, FileContentModel.byte_offset <= start)
+                    .order_by(FileContentModel.byte_offset.desc())
+                    .limit(1)
+                    .scalar_subquery()
+                )
+                statement = (
+                    select(
+                        FileContentModel.file_id,
+                        FileContentModel.chunk_seq,
+                        FileContentModel.byte_offset,
+                        CHUNK_CONTENT.label("content"),
+                        FileContentModel.storage_segment,
+                        FileContentModel.storage_offset,
+                        FileContentModel.stored_length,
+                    )
+                    .outerjoin(ChunkStoreModel, ChunkStoreModel.content_hash == FileContentModel.content_hash)
+                    .where(FileContentModel.file_id == unique_id, FileContentModel.chunk_seq >= first_chunk_seq)
+                    .order_by(FileContentModel.chunk_seq)
+                    .execution_options(yield_per=settings.download_fetch_size)
+                )
+                result = await async_session.stream(statement)
+                async for chunks in result.partitions():
+                    for byte_offset, content in await run_in_threadpool(InterruptDatabase.decode_chunks, chunks):
+                        yield byte_offset, content
+            except BaseAlchemyException as base_alchemy_error:
+                logging.error(base_alchemy_error)
+                raise base_alchemy_error
+
+    @staticmethod
+    def decode_chunks(chunks: list[Row]) -> list[tuple[int, bytes]]:
+        decoded: list[tuple[int, bytes]] = []
+        for chunk in chunks:
+            content: bytes = chunk.content if chunk.content is not None else chunk_storage.read_chunk(chunk)
+            decoded.append((chunk.byte_offset, decode_chunk(content)))
+        return decoded
@@ -0,0 +1,25 @@
+from app.config import settings
+from app.crud.storage.chunk_storage import ChunkStorage
+from app.crud.storage.filesystem_chunk_storage import FilesystemChunkStorage
+from app.crud.storage.memory_chunk_storage import MemoryChunkStorage
+from app.crud.storage.postgres_chunk_storage import PostgresChunkStorage
+
+CHUNK_STORAGE_ENGINES: tuple[str, ...] = ("postgres", "filesystem", "memory")
+
+
+def get_chunk_storage() -> ChunkStorage:
+    if settings.chunk_storage == "postgres":
+        return PostgresChunkStorage()
+    if settings.chunk_storage == "filesystem":
+        return FilesystemChunkStorage(
+            settings.chunk_storage_directory,
+            settings.chunk_storage_segment_size,
+            settings.chunk_storage_fsync_delay,
+            settings.chunk_storage_reclaim_delay,
+        )
+    if settings.chunk_storage == "memory":
+        return MemoryChunkStorage()
+    raise ValueError(f"Unsupported chunk storage {settings.chunk_storage!r}, available: {CHUNK_STORAGE_ENGINES}")
+
+
+chunk_storage: ChunkStorage = get_chunk_storage()
@@ -0,0 +1,49 @@
+from abc import ABC, abstractmethod
+from typing import Iterable
+
+from sqlalchemy import Row
+
+
+def missing_body_error(chunk: Row) -> LookupError:
+    return LookupError(f"Chunk {chunk.chunk_seq} of file {chunk.file_id} has no stored body")
+
+
+class ChunkStorage(ABC):
+    """Where the encoded bodies of uploaded chunks are kept.
+
+    Postgres keeps the ``file_content`` row of every chunk whatever the engine: its position in the
+    file, its length and where its body is. Engines only store the bodies, and describe where each
+    one went as ``file_content`` column values that are written with the row.
+    """
+
+    @abstractmethod
+    async def write_chunks(self, unique_id: str, first_chunk_seq: int, bodies: list[bytes]) -> list[dict]:
+        """Store consecutive chunk bodies and return the ``file_content`` column values locating each one.
+
+        Bodies must be durable when this returns, since the rows pointing at them are committed next.
+        Writing the same chunks again, as a replayed batch does, must be harmless.
+        """
+
+    @abstractmethod
+    def read_chunk(self, chunk: Row) -> bytes:
+        """Return the stored body of a ``file_content`` row that does not hold it inline. Called from a thread.
+
+        Raises ``LookupError`` when the engine holds no body for it.
+        """
+
+    def delete_chunks(self, chunks: Iterable[Row]) -> None:
+        """Forget the bodies of deleted ``file_content`` rows, given as ``(file_id, chunk_seq, ...)``."""
+
+    def get_reclaimable_segments(self) -> list[str]:
+        """Return segments that may have lost their last chunk and that no writer can append to any more.
+
+        The caller deletes, with ``delete_segments``, those that no ``file_content`` row points to.
+        Called from a thread.
+        """
+        return []
+
+    def delete_segments(self, segment_names: Iterable[str]) -> None:
+        """Remove segments that hold no live chunk. Called from a thread."""
+
+    async def close(self) -> None:
+        pass
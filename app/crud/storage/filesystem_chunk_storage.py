@@ -0,0 +1,180 @@
+import asyncio
+import fcntl
+import mmap
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import BinaryIO, Iterable, Optional
+
+from sqlalchemy import Row
+from starlette.concurrency import run_in_threadpool
+
+from app.crud.storage.chunk_storage import ChunkStorage, missing_body_error
+
+MAX_MAPPED_SEGMENTS = 256
+
+
+class FilesystemChunkStorage(ChunkStorage):
+    """Appends bodies to segment files in a local or shared directory and reads them back through mmap.
+
+    Every process appends only to its own segments, named after a random writer id, and starts a
+    new one once ``segment_size`` is reached. The offset index is the ``file_content`` rows: each row
+    records its segment, offset and stored length, so any process sharing the directory can read
+    any chunk. Writes are group-committed: concurrent batches wait for one fsync started
+    ``fsync_delay`` after the first of them.
+
+    A segment is deleted once no row points to it any more. Only sealed segments qualify: the
+    writer holds an exclusive ``flock`` on the segment it appends to, and a segment must not have
+    been written to for ``reclaim_delay``, so the rows of its last batch are committed by then.
+    Segments that are not quiet yet are checked again after the next delete.
+    """
+
+    def __init__(self, directory: str, segment_size: int, fsync_delay: float, reclaim_delay: float):
+        self.directory: str = directory
+        self.segment_size: int = segment_size
+        self.fsync_delay: float = fsync_delay
+        self.reclaim_delay: float = reclaim_delay
+        self.writer_id: str = uuid.uuid4().hex[:12]
+        self.segment_number: int = 0
+        self.segment_name: Optional[str] = None
+        self.segment: Optional[BinaryIO] = None
+        self.segment_length: int = 0
+        self.write_lock: threading.Lock = threading.Lock()
+        self.pending_sync: Optional[asyncio.Task] = None
+        self.mapped_segments: OrderedDict[str, mmap.mmap] = OrderedDict()
+        self.map_lock: threading.Lock = threading.Lock()
+        self.emptied_segments: set[str] = set()
+
+    async def write_chunks(self, unique_id: str, first_chunk_seq: int, bodies: list[bytes]) -> list[dict]:
+        segment_name, offset = await run_in_threadpool(self.append, bodies)
+        await self.sync()
+        locations: list[dict] = []
+        for body in bodies:
+            locations.append({"storage_segment": segment_name, "storage_offset": offset, "stored_length": len(body)})
+            offset += len(body)
+        return locations
+
+    def append(self, bodies: list[bytes]) -> tuple[str, int]:
+        """Append the bodies back to back to one segment and return it with the offset of the first."""
+        size: int = sum(len(body) for body in bodies)
+        with self.write_lock:
+            if self.segment is None or (self.segment_length and self.segment_length + size > self.segment_size):
+                self.open_segment()
+            offset: int = self.segment_length
+            self.segment.writelines(bodies)
+            self.segment.flush()
+            self.segment_length += size
+            return self.segment_name, offset
+
+    def open_segment(self) -> None:
+        # Called under write_lock. The full segment is synced here, as later fsyncs only cover the new one.
+        self.close_segment()
+        os.makedirs(self.directory, exist_ok=True)
+        self.segment_number += 1
+        self.segment_name = f"{self.writer_id}-{self.segment_number:06d}.seg"
+        self.segment = open(os.path.join(self.directory, self.segment_name), "ab")
+        # Held until the segment is closed, by this process or by its death, and tells reclaimers it is open.
+        fcntl.flock(self.segment.fileno(), fcntl.LOCK_EX)
+        self.segment_length = self.segment.tell()
+        directory_fd: int = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(directory_fd)
+        finally:
+            os.close(directory_fd)
+
+    def close_segment(self) -> None:
+        if self.segment is not None:
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.segment.close()
+            self.segment = None
+
+    async def sync(self) -> None:
+        """Wait until everything appended so far is on disk, sharing one fsync among concurrent writers."""
+        if self.pending_sync is None:
+            self.pending_sync = asyncio.create_task(self.run_sync())
+        await asyncio.shield(self.pending_sync)
+
+    async def run_sync(self) -> None:
+        await asyncio.sleep(self.fsync_delay)
+        # Writers arriving from here on wait for the next fsync, which starts after their append.
+        self.pending_sync = None
+        await run_in_threadpool(self.fsync_segment)
+
+    def fsync_segment(self) -> None:
+        with self.write_lock:
+            if self.segment is None:
+                return
+            # A duplicate descriptor lets appends go on during the fsync, and survives the segment being closed.
+            segment_fd: int = os.dup(self.segment.fileno())
+        try:
+            os.fsync(segment_fd)
+        finally:
+            os.close(segment_fd)
+
+    def read_chunk(self, chunk: Row) -> bytes:
+        if chunk.storage_segment is None:
+            raise missing_body_error(chunk)
+        end: int = chunk.storage_offset + chunk.stored_length
+        return self.get_mapped_segment(chunk.storage_segment, end)[chunk.storage_offset : end]
+
+    def get_mapped_segment(self, segment_name: str, length: int) -> mmap.mmap:
+        with self.map_lock:
+            mapped: Optional[mmap.mmap] = self.mapped_segments.get(segment_name)
+            # A segment still being appended to is mapped again once a chunk lies past the mapped end.
+            # Replaced maps are not closed: readers in other threads may still be slicing them.
+            if mapped is None or len(mapped) < length:
+                with open(os.path.join(self.directory, segment_name), "rb") as segment_file:
+                    mapped = mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+                self.mapped_segments[segment_name] = mapped
+                if len(self.mapped_segments) > MAX_MAPPED_SEGMENTS:
+                    self.mapped_segments.popitem(last=False)
+            self.mapped_segments.move_to_end(segment_name)
+            return mapped
+
+    def delete_chunks(self, chunks: Iterable[Row]) -> None:
+        self.emptied_segments.update(chunk.storage_segment for chunk in chunks if chunk.storage_segment)
+
+    def get_reclaimable_segments(self) -> list[str]:
+        reclaimable: list[str] = []
+        for segment_name in list(self.emptied_segments):
+            if self.is_sealed(segment_name) is not False:
+                self.emptied_segments.discard(segment_name)
+                reclaimable.append(segment_name)
+        return reclaimable
+
+    def is_sealed(self, segment_name: str) -> Optional[bool]:
+        """Whether nothing can be appended to a segment any more, or None when it is already gone."""
+        try:
+            segment_fd: int = os.open(os.path.join(self.directory, segment_name), os.O_RDONLY)
+        except FileNotFoundError:
+            return None
+        try:
+            if time.time() - os.fstat(segment_fd).st_mtime < self.reclaim_delay:
+                return False
+            fcntl.flock(segment_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+        finally:
+            os.close(segment_fd)
+
+    def delete_segments(self, segment_names: Iterable[str]) -> None:
+        for segment_name in segment_names:
+            with self.map_lock:
+                # Readers still holding the map keep it valid after the file is gone.
+                self.mapped_segments.pop(segment_name, None)
+            try:
+                os.remove(os.path.join(self.directory, segment_name))
+            except FileNotFoundError:
+                pass
+
+    async def close(self) -> None:
+        if self.pending_sync is not None:
+            await self.pending_sync
+        with self.write_lock:
+            self.close_segment()
+        with self.map_lock:
+            self.mapped_segments.clear()
@@ -0,0 +1,31 @@
+from typing import Iterable
+
+from sqlalchemy import Row
+
+from app.crud.storage.chunk_storage import ChunkStorage, missing_body_error
+
+
+class MemoryChunkStorage(ChunkStorage):
+    """Keeps bodies in a dict of the current process, keyed by ``(file_id, chunk_seq)``.
+
+    Meant for tests and single-process runs: bodies are gone after a restart, and neither upload
+    workers nor other API processes can read what this one stored.
+    """
+
+    def __init__(self):
+        self.chunks: dict[tuple[str, int], bytes] = {}
+
+    async def write_chunks(self, unique_id: str, first_chunk_seq: int, bodies: list[bytes]) -> list[dict]:
+        for index, body in enumerate(bodies):
+            self.chunks[(unique_id, first_chunk_seq + index)] = body
+        return [{} for _ in bodies]
+
+    def read_chunk(self, chunk: Row) -> bytes:
+        body: bytes | None = self.chunks.get((str(chunk.file_id), chunk.chunk_seq))
+        if body is None:
+            raise missing_body_error(chunk)
+        return body
+
+    def delete_chunks(self, chunks: Iterable[Row]) -> None:
+        for chunk in chunks:
+            self.chunks.pop((str(chunk.file_id), chunk.chunk_seq), None)
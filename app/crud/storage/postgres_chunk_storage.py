@@ -0,0 +1,13 @@
+from sqlalchemy import Row
+
+from app.crud.storage.chunk_storage import ChunkStorage, missing_body_error
+
+
+class PostgresChunkStorage(ChunkStorage):
+    """Keeps bodies in the ``content`` column of their own ``file_content`` rows, written in the same statement."""
+
+    async def write_chunks(self, unique_id: str, first_chunk_seq: int, bodies: list[bytes]) -> list[dict]:
+        return [{"content": body} for body in bodies]
+
+    def read_chunk(self, chunk: Row) -> bytes:
+        raise missing_body_error(chunk)
@@ -0,0 +1,5 @@
+class InvalidStatusTransitionError(Exception):
+    def __init__(self, current_status: str, status: str):
+        super().__init__(f"File upload cannot move from {current_status} to {status}")
+        self.current_status: str = current_status
+        self.status: str = status
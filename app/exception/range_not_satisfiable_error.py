@@ -0,0 +1,4 @@
+class RangeNotSatisfiableError(Exception):
+    def __init__(self, content_length: int):
+        super().__init__(f"Requested range is not satisfiable for a file of {content_length} bytes")
+        self.content_length: int = content_length
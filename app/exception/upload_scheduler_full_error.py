@@ -0,0 +1,2 @@
+class UploadSchedulerFullError(Exception):
+    pass
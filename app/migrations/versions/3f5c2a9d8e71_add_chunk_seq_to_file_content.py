@@ -0,0 +1,38 @@
+"""add chunk_seq to file_content
+
+Revision ID: 3f5c2a9d8e71
+Revises: 
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f5c2a9d8e71"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "file_content",
+        sa.Column("chunk_seq", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Existing chunks were ordered by insertion, so number them by id within each file.
+    op.execute(
+        """
+        UPDATE file_content
+        SET chunk_seq = numbered.chunk_seq
+        FROM (
+            SELECT id, ROW_NUMBER() OVER (PARTITION BY file_id ORDER BY id) - 1 AS chunk_seq
+            FROM file_content
+        ) AS numbered
+        WHERE file_content.id = numbered.id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_column("file_content", "chunk_seq")
@@ -0,0 +1,57 @@
+"""store chunk content as codec-encoded bytea
+
+Revision ID: 5a0c9e2d7b48
+Revises: e7d3b6a4f215
+Create Date: 2026-10-18 15:08:52.407316
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5a0c9e2d7b48"
+down_revision = "e7d3b6a4f215"
+branch_labels = None
+depends_on = None
+
+# Existing text becomes a body with the "none" codec header byte (see app.utils.codec_utils).
+ENCODE_TEXT = "decode('00', 'hex') || convert_to(content, 'UTF8')"
+DECODE_TEXT = "convert_from(substring(content from 2), 'UTF8')"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "file_content",
+        sa.Column("chunk_length", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Lengths are of the original text, which is still readable before the conversion below.
+    op.execute(
+        """
+        UPDATE file_content
+        SET chunk_length = octet_length(COALESCE(file_content.content, chunk_store.content))
+        FROM file_content AS chunk
+        LEFT JOIN chunk_store ON chunk_store.content_hash = chunk.content_hash
+        WHERE file_content.id = chunk.id
+        """
+    )
+    op.alter_column(
+        "file_content",
+        "content",
+        type_=sa.LargeBinary(),
+        existing_nullable=True,
+        postgresql_using=ENCODE_TEXT,
+    )
+    op.alter_column(
+        "chunk_store",
+        "content",
+        type_=sa.LargeBinary(),
+        existing_nullable=False,
+        postgresql_using=ENCODE_TEXT,
+    )
+
+
+def downgrade() -> None:
+    # Only uncompressed bodies can be turned back into text; decompress others before downgrading.
+    op.alter_column("chunk_store", "content", type_=sa.Text(), existing_nullable=False, postgresql_using=DECODE_TEXT)
+    op.alter_column("file_content", "content", type_=sa.Text(), existing_nullable=True, postgresql_using=DECODE_TEXT)
+    op.drop_column("file_content", "chunk_length")
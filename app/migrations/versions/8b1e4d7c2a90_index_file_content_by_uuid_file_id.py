@@ -0,0 +1,39 @@
+"""index file_content by uuid file_id and chunk_seq
+
+Revision ID: 8b1e4d7c2a90
+Revises: 3f5c2a9d8e71
+Create Date: 2026-10-18 11:02:17.904551
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "8b1e4d7c2a90"
+down_revision = "3f5c2a9d8e71"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_file_content_file_id_chunk_seq"
+
+
+def upgrade() -> None:
+    op.alter_column(
+        "file_content",
+        "file_id",
+        type_=sa.Uuid(as_uuid=False),
+        existing_nullable=False,
+        postgresql_using="file_id::uuid",
+    )
+    op.create_index(INDEX_NAME, "file_content", ["file_id", "chunk_seq"], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="file_content")
+    op.alter_column(
+        "file_content",
+        "file_id",
+        type_=sa.Text(),
+        existing_nullable=False,
+        postgresql_using="file_id::text",
+    )
@@ -0,0 +1,31 @@
+"""record where chunk bodies kept outside postgres are stored
+
+Revision ID: 9d2f6b1c3e87
+Revises: 5a0c9e2d7b48
+Create Date: 2026-10-18 17:42:10.583921
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "9d2f6b1c3e87"
+down_revision = "5a0c9e2d7b48"
+branch_labels = None
+depends_on = None
+
+LOCATION_COLUMNS = (
+    ("storage_segment", sa.Text()),
+    ("storage_offset", sa.BigInteger()),
+    ("stored_length", sa.BigInteger()),
+)
+
+
+def upgrade() -> None:
+    for name, type_ in LOCATION_COLUMNS:
+        op.add_column("file_content", sa.Column(name, type_, nullable=True))
+
+
+def downgrade() -> None:
+    for name, _ in reversed(LOCATION_COLUMNS):
+        op.drop_column("file_content", name)
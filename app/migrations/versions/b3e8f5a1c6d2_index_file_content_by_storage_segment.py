@@ -0,0 +1,30 @@
+"""index file_content by storage_segment
+
+Revision ID: b3e8f5a1c6d2
+Revises: 9d2f6b1c3e87
+Create Date: 2026-10-18 21:16:48.730164
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b3e8f5a1c6d2"
+down_revision = "9d2f6b1c3e87"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_file_content_storage_segment"
+
+
+def upgrade() -> None:
+    op.create_index(
+        INDEX_NAME,
+        "file_content",
+        ["storage_segment"],
+        postgresql_where=sa.text("storage_segment IS NOT NULL"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="file_content")
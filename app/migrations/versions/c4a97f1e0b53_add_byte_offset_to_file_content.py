@@ -0,0 +1,44 @@
+"""add byte_offset to file_content
+
+Revision ID: c4a97f1e0b53
+Revises: 8b1e4d7c2a90
+Create Date: 2026-10-18 11:47:05.662830
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c4a97f1e0b53"
+down_revision = "8b1e4d7c2a90"
+branch_labels = None
+depends_on = None
+
+INDEX_NAME = "ix_file_content_file_id_byte_offset"
+
+
+def upgrade() -> None:
+    op.add_column(
+        "file_content",
+        sa.Column("byte_offset", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    # Each chunk starts where the chunks before it in the same file end.
+    op.execute(
+        """
+        UPDATE file_content
+        SET byte_offset = numbered.byte_offset
+        FROM (
+            SELECT id, SUM(octet_length(content)) OVER (
+                PARTITION BY file_id ORDER BY chunk_seq
+            ) - octet_length(content) AS byte_offset
+            FROM file_content
+        ) AS numbered
+        WHERE file_content.id = numbered.id
+        """
+    )
+    op.create_index(INDEX_NAME, "file_content", ["file_id", "byte_offset"])
+
+
+def downgrade() -> None:
+    op.drop_index(INDEX_NAME, table_name="file_content")
+    op.drop_column("file_content", "byte_offset")
@@ -0,0 +1,46 @@
+"""add chunk_store for deduplicated chunk content
+
+Revision ID: e7d3b6a4f215
+Revises: c4a97f1e0b53
+Create Date: 2026-10-18 14:21:39.118204
+
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e7d3b6a4f215"
+down_revision = "c4a97f1e0b53"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "chunk_store",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.Column("content_hash", sa.Text(), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("ref_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("content_hash"),
+    )
+    op.create_index(op.f("ix_chunk_store_id"), "chunk_store", ["id"], unique=True)
+    op.add_column("file_content", sa.Column("content_hash", sa.Text(), nullable=True))
+    op.alter_column("file_content", "content", existing_type=sa.Text(), nullable=True)
+
+
+def downgrade() -> None:
+    # Deduplicated chunks have no inline body; copy it back before the column becomes required again.
+    op.execute(
+        """
+        UPDATE file_content
+        SET content = chunk_store.content, content_hash = NULL
+        FROM chunk_store
+        WHERE file_content.content_hash = chunk_store.content_hash
+        """
+    )
+    op.alter_column("file_content", "content", existing_type=sa.Text(), nullable=False)
+    op.drop_column("file_content", "content_hash")
+    op.drop_table("chunk_store")
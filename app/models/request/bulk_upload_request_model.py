@@ -0,0 +1,20 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, root_validator
+
+from app.config import settings
+
+
+class BulkUploadRequestModel(BaseModel):
+    """Selects uploads for a bulk action, either by id or by filter; one of the two is required."""
+
+    upload_ids: Optional[list[str]] = Field(default=None, min_items=1, max_items=settings.bulk_max_uploads)
+    file_name: Optional[str] = None
+    older_than_seconds: Optional[float] = Field(default=None, gt=0)
+
+    @root_validator(skip_on_failure=True)
+    @classmethod
+    def check_selection(cls, values: dict) -> dict:
+        if values.get("upload_ids") is None and not values.get("file_name") and not values.get("older_than_seconds"):
+            raise ValueError("Either upload_ids or a file_name/older_than_seconds filter is required")
+        return values
@@ -1,4 +1,6 @@
 import enum
+import time
+from typing import Optional
 
 from aredis_om import Field, JsonModel
 
@@ -14,5 +16,9 @@ class FileStatusModel(JsonModel):
     unique_id: str = Field(primary_key=True, index=True)
     file_name: str = Field(index=True)
     status: FileUploadStatus = Field(index=True)
-    content: str
-    chunk_range: list[tuple[int, int]]
+    # None for records written before uploads were spooled; see InterruptCache.restore_legacy_upload.
+    spool_path: Optional[str] = None
+    created_at: float = Field(index=True, default_factory=time.time)
+    content_length: int = 0
+    chunk_cursor: int = 0
+    byte_cursor: int = 0
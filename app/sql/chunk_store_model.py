@@ -0,0 +1,11 @@
+from sqlalchemy import BigInteger, Column, LargeBinary, Text
+
+from app.sql.base import BaseModel
+
+
+class ChunkStoreModel(BaseModel):
+    __tablename__ = "chunk_store"
+
+    content_hash = Column(Text, nullable=False, unique=True)
+    content = Column(LargeBinary, nullable=False)
+    ref_count = Column(BigInteger, nullable=False, default=0, server_default="0")
@@ -1,6 +1,6 @@
 import enum
 
-from sqlalchemy import Column, Enum, Text
+from sqlalchemy import BigInteger, Column, Enum, Index, LargeBinary, Text, Uuid, text
 
 from app.sql.base import BaseModel
 
@@ -13,8 +13,26 @@ class FileUploadStatus(enum.Enum):
 
 class FileContentModel(BaseModel):
     __tablename__ = "file_content"
+    __table_args__ = (
+        Index("ix_file_content_file_id_chunk_seq", "file_id", "chunk_seq", unique=True),
+        Index("ix_file_content_file_id_byte_offset", "file_id", "byte_offset"),
+        Index(
+            "ix_file_content_storage_segment",
+            "storage_segment",
+            postgresql_where=text("storage_segment IS NOT NULL"),
+        ),
+    )
 
     file_name = Column(Text, nullable=False)
-    file_id = Column(Text, nullable=False)
-    content = Column(Text, nullable=False)
+    file_id = Column(Uuid(as_uuid=False), nullable=False)
+    chunk_seq = Column(BigInteger, nullable=False, default=0, server_default="0")
+    byte_offset = Column(BigInteger, nullable=False, default=0, server_default="0")
+    chunk_length = Column(BigInteger, nullable=False, default=0, server_default="0")
+    # Bodies are stored encoded by app.utils.codec_utils: inline here, in chunk_store when deduplicated,
+    # or in the segment file named below when the filesystem chunk storage is used.
+    content = Column(LargeBinary, nullable=True)
+    content_hash = Column(Text, nullable=True)
+    storage_segment = Column(Text, nullable=True)
+    storage_offset = Column(BigInteger, nullable=True)
+    stored_length = Column(BigInteger, nullable=True)
     status = Column(Enum(FileUploadStatus), nullable=False, default=FileUploadStatus.UPLOADING)
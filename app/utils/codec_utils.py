@@ -0,0 +1,68 @@
+import lzma
+import zlib
+from typing import Callable, Optional
+
+from app.config import settings
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib and lzma ship with Python.
+    zstandard = None
+
+# Every stored chunk starts with one byte naming its codec, so chunks written under an earlier
+# UPLOAD_COMPRESSION setting still decode after it changes.
+CODEC_IDS: dict[str, int] = {"none": 0, "zlib": 1, "lzma": 2, "zstd": 3}
+CODEC_NAMES: dict[int, str] = {codec_id: name for name, codec_id in CODEC_IDS.items()}
+
+
+def zstd_compress(data: bytes, level: Optional[int]) -> bytes:
+    return zstandard.ZstdCompressor(level=3 if level is None else level).compress(data)
+
+
+def zstd_decompress(data: bytes) -> bytes:
+    return zstandard.ZstdDecompressor().decompress(data)
+
+
+COMPRESSORS: dict[str, Callable[[bytes, Optional[int]], bytes]] = {
+    "none": lambda data, level: bytes(data),
+    "zlib": lambda data, level: zlib.compress(data, 6 if level is None else level),
+    "lzma": lambda data, level: lzma.compress(data, preset=6 if level is None else level),
+}
+DECOMPRESSORS: dict[str, Callable[[bytes], bytes]] = {
+    "none": bytes,
+    "zlib": zlib.decompress,
+    "lzma": lzma.decompress,
+}
+if zstandard is not None:
+    COMPRESSORS["zstd"] = zstd_compress
+    DECOMPRESSORS["zstd"] = zstd_decompress
+
+
+def get_available_codecs() -> list[str]:
+    return list(COMPRESSORS)
+
+
+def encode_chunk(
+    data: bytes | memoryview,
+    codec: Optional[str] = None,
+    level: Optional[int] = None,
+) -> bytes:
+    """Compress a chunk body for storage with ``codec``, by default the configured one.
+
+    Bodies that do not get smaller are stored uncompressed, so reading them back costs nothing.
+    """
+    codec = codec or settings.upload_compression
+    if codec not in COMPRESSORS:
+        raise ValueError(f"Unsupported compression codec {codec!r}, available: {get_available_codecs()}")
+    level = settings.upload_compression_level if level is None else level
+    compressed: bytes = COMPRESSORS[codec](data, level)
+    if codec != "none" and len(compressed) >= len(data):
+        codec, compressed = "none", bytes(data)
+    return bytes((CODEC_IDS[codec],)) + compressed
+
+
+def decode_chunk(stored: bytes) -> bytes:
+    codec: Optional[str] = CODEC_NAMES.get(stored[0])
+    if codec not in DECOMPRESSORS:
+        raise ValueError(f"Stored chunk uses unsupported compression codec {codec or stored[0]!r}")
+    return DECOMPRESSORS[codec](memoryview(stored)[1:])
@@ -0,0 +1,182 @@
+import codecs
+import os
+import zlib
+from typing import AsyncGenerator, AsyncIterable, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.exception.range_not_satisfiable_error import RangeNotSatisfiableError
+from app.utils.metrics_utils import time_stage, upload_bytes_ingested_total
+
+# A line ends a content-defined chunk when the low bits of its CRC-32 are zero: about one line in 32.
+CONTENT_DEFINED_LINE_MASK = 0x1F
+
+
+async def iter_upload_blocks(file: UploadFile, block_size: int) -> AsyncGenerator[bytes, None]:
+    """Read an upload spool in fixed-size blocks, validating that the stream is UTF-8 as it goes.
+
+    A block may end in the middle of a multibyte character, so validation uses an incremental
+    decoder and only fails on a truncated character once the stream is exhausted.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    while True:
+        with time_stage("file_read"):
+            block: bytes = await file.read(block_size)
+        if not block:
+            break
+        with time_stage("utf8_validate"):
+            decoder.decode(block)
+        upload_bytes_ingested_total.inc(len(block))
+        yield block
+    decoder.decode(b"", final=True)
+
+
+def get_spool_path(unique_id: str) -> str:
+    return os.path.abspath(os.path.join(settings.upload_spool_directory, unique_id))
+
+
+def write_spool_file(unique_id: str, content: bytes) -> str:
+    spool_path: str = get_spool_path(unique_id)
+    os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+    with open(spool_path, "wb") as spool_file:
+        spool_file.write(content)
+    return spool_path
+
+
+def remove_spool_file(unique_id: str) -> None:
+    try:
+        os.remove(get_spool_path(unique_id))
+    except FileNotFoundError:
+        pass
+
+
+def remove_spool_files(unique_ids: list[str]) -> None:
+    for unique_id in unique_ids:
+        remove_spool_file(unique_id)
+
+
+def align_to_utf8_boundary(view: memoryview, start: int, end: int) -> int:
+    """Move ``end`` back so that it does not fall inside a multibyte UTF-8 sequence."""
+    boundary: int = end
+    while boundary > start and view[boundary] & 0xC0 == 0x80:
+        boundary -= 1
+    if boundary > start:
+        return boundary
+    # Chunk size is smaller than a single character: extend forward to the next code point.
+    while end < len(view) and view[end] & 0xC0 == 0x80:
+        end += 1
+    return end
+
+
+def find_content_defined_boundary(data: bytes, start: int, end: int) -> int:
+    """Return where a chunk starting at ``start`` should end, at most ``end``, judging by its lines.
+
+    The chunk ends after the first line, past a quarter of the maximum size, whose hash matches
+    ``CONTENT_DEFINED_LINE_MASK``. Boundaries follow the text rather than byte positions, so text
+    inserted or removed early in a file only changes the chunks around the edit.
+    """
+    line_start: int = start
+    newline: int = data.find(b"\n", start + (end - start) // 4, end)
+    if newline != -1:
+        line_start = data.rfind(b"\n", start, newline) + 1 or start
+    while newline != -1:
+        if zlib.crc32(data[line_start:newline]) & CONTENT_DEFINED_LINE_MASK == 0:
+            return newline + 1
+        line_start = newline + 1
+        newline = data.find(b"\n", line_start, end)
+    return end
+
+
+async def iter_spool_chunks(
+    spool_path: str,
+    chunk_size: int,
+    byte_cursor: int = 0,
+    content_defined: bool = False,
+) -> AsyncGenerator[tuple[int, memoryview], None]:
+    """Yield ``(byte_offset, chunk)`` for every chunk of a spooled upload from ``byte_cursor`` onwards.
+
+    Chunks are at most ``chunk_size`` bytes and always end on a UTF-8 code point boundary. They are
+    ``memoryview`` slices of the block read from disk, so no intermediate copies are made. The
+    boundaries only depend on where the previous chunk ended, so resuming from a committed
+    ``byte_cursor`` produces exactly the same chunk table as the original pass. With
+    ``content_defined`` chunks end at line boundaries chosen by ``find_content_defined_boundary``.
+    """
+    read_size: int = max(settings.upload_read_block_size, chunk_size)
+    spool_file = await run_in_threadpool(open, spool_path, "rb")
+    try:
+        await run_in_threadpool(spool_file.seek, byte_cursor)
+        offset: int = byte_cursor
+        pending: bytes = b""
+        while True:
+            with time_stage("spool_read"):
+                block: bytes = await run_in_threadpool(spool_file.read, read_size)
+            eof: bool = not block
+            data: bytes = pending + block if pending else block
+            view = memoryview(data)
+            position: int = 0
+            # Keep at least one byte past a cut so the boundary can be checked, unless at end of file.
+            while len(data) - position > chunk_size or (eof and position < len(data)):
+                end: int = min(position + chunk_size, len(data))
+                if content_defined:
+                    end = find_content_defined_boundary(data, position, end)
+                if end < len(data):
+                    end = align_to_utf8_boundary(view, position, end)
+                yield offset, view[position:end]
+                offset += end - position
+                position = end
+            if eof:
+                break
+            pending = data[position:]
+    finally:
+        await run_in_threadpool(spool_file.close)
+
+
+async def iter_chunk_batches(
+    chunks: AsyncIterable[tuple[int, memoryview]], batch_size: int, batch_bytes: int
+) -> AsyncGenerator[list[tuple[int, memoryview]], None]:
+    """Group ``(byte_offset, chunk)`` pairs into batches of at most ``batch_size`` chunks and ``batch_bytes`` bytes.
+
+    A chunk larger than ``batch_bytes`` still gets a batch of its own.
+    """
+    batch: list[tuple[int, memoryview]] = []
+    size: int = 0
+    async for offset, chunk in chunks:
+        if batch and size + len(chunk) > batch_bytes:
+            yield batch
+            batch, size = [], 0
+        batch.append((offset, chunk))
+        size += len(chunk)
+        if len(batch) >= batch_size:
+            yield batch
+            batch, size = [], 0
+    if batch:
+        yield batch
+
+
+def parse_byte_range(range_header: Optional[str], content_length: int) -> Optional[tuple[int, int]]:
+    """Resolve a single ``Range: bytes=...`` header to an inclusive ``(start, end)`` pair.
+
+    Returns None when the whole file should be sent: no header, another unit, or several ranges,
+    which servers may answer with the full representation.
+    """
+    if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+        return None
+    first, _, last = range_header[len("bytes=") :].strip().partition("-")
+    try:
+        if not first:
+            suffix_length = int(last)
+            if suffix_length <= 0:
+                raise RangeNotSatisfiableError(content_length)
+            start, end = max(content_length - suffix_length, 0), content_length - 1
+        else:
+            start = int(first)
+            if last and int(last) < start:
+                return None
+            end = min(int(last), content_length - 1) if last else content_length - 1
+    except ValueError:
+        return None
+    if start >= content_length:
+        raise RangeNotSatisfiableError(content_length)
+    return start, end
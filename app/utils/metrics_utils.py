@@ -0,0 +1,155 @@
+import math
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)  # fmt: skip
+
+
+def format_labels(label_names: tuple[str, ...], label_values: tuple[str, ...], extra: str = "") -> str:
+    pairs: list[str] = [f'{name}="{value}"' for name, value in zip(label_names, label_values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric(ABC):
+    metric_type: str = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name: str = name
+        self.documentation: str = documentation
+        self.label_names: tuple[str, ...] = label_names
+        registry.append(self)
+
+    @abstractmethod
+    def collect(self) -> list[str]:
+        """Return the sample lines of the metric, without its HELP and TYPE lines."""
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}", *self.collect()]
+
+
+class CounterMetric(Metric):
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self.values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, *label_values: str) -> None:
+        self.values[label_values] = self.values.get(label_values, 0) + amount
+
+    def collect(self) -> list[str]:
+        if not self.values and not self.label_names:
+            return [f"{self.name} 0"]
+        return [
+            f"{self.name}{format_labels(self.label_names, label_values)} {format_value(value)}"
+            for label_values, value in self.values.items()
+        ]
+
+
+class Gauge(Metric):
+    """A value read from ``callback`` at scrape time, so it never goes stale between updates."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.callback: Callable[[], float] = callback
+
+    def collect(self) -> list[str]:
+        return [f"{self.name} {format_value(self.callback())}"]
+
+
+class Histogram(Metric):
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets: tuple[float, ...] = (*buckets, math.inf)
+        self.counts: dict[tuple[str, ...], list[int]] = {}
+        self.sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        counts: list[int] = self.counts.setdefault(label_values, [0] * len(self.buckets))
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[index] += 1
+                break
+        self.sums[label_values] = self.sums.get(label_values, 0.0) + value
+
+    def collect(self) -> list[str]:
+        lines: list[str] = []
+        for label_values, counts in self.counts.items():
+            cumulative: int = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                labels: str = format_labels(self.label_names, label_values, f'le="{format_value(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(self.label_names, label_values)
+            lines.append(f"{self.name}_sum{labels} {format_value(self.sums[label_values])}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+registry: list[Metric] = []
+
+
+def render_metrics() -> str:
+    """Render every registered metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in registry for line in metric.render()) + "\n"
+
+
+upload_stage_seconds: Histogram = Histogram(
+    "upload_stage_seconds", "Time spent in each stage of the upload pipeline", label_names=("stage",)
+)
+upload_bytes_ingested_total: CounterMetric = CounterMetric(
+    "upload_bytes_ingested_total", "Bytes received from clients in uploaded files"
+)
+upload_chunks_written_total: CounterMetric = CounterMetric(
+    "upload_chunks_written_total", "Chunks committed to the database by upload writers"
+)
+uploads_total: CounterMetric = CounterMetric("uploads_total", "Uploads by outcome", label_names=("outcome",))
+uploads_rejected_total: CounterMetric = CounterMetric(
+    "uploads_rejected_total", "Uploads turned away by admission control", label_names=("reason",)
+)
+
+
+@contextmanager
+def time_stage(stage: str) -> Iterator[None]:
+    started: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        upload_stage_seconds.observe(time.perf_counter() - started, stage)
+
+
+def observe_stage(stage: str):
+    """Record how long every call of the decorated coroutine function takes as ``stage``."""
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with time_stage(stage):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
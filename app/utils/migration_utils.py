@@ -0,0 +1,28 @@
+import os
+import re
+from functools import lru_cache
+from typing import Optional
+
+MIGRATION_VERSIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), "migrations", "versions")
+
+REVISION_PATTERN = re.compile(r"^(down_revision|revision)\s*(?::[^=]*)?=\s*(.+)$", re.MULTILINE)
+QUOTED_PATTERN = re.compile(r"['\"]([^'\"]+)['\"]")
+
+
+@lru_cache
+def get_head_revision() -> Optional[str]:
+    """Head of the migration history, read from the version files without importing Alembic.
+
+    Returns ``None`` when the history has no single head, so the caller falls back to a full upgrade.
+    """
+    revisions: set[str] = set()
+    down_revisions: set[str] = set()
+    for file_name in os.listdir(MIGRATION_VERSIONS_DIRECTORY):
+        if not file_name.endswith(".py"):
+            continue
+        with open(os.path.join(MIGRATION_VERSIONS_DIRECTORY, file_name)) as version_file:
+            for name, value in REVISION_PATTERN.findall(version_file.read()):
+                target: set[str] = revisions if name == "revision" else down_revisions
+                target.update(QUOTED_PATTERN.findall(value))
+    heads: set[str] = revisions - down_revisions
+    return heads.pop() if len(heads) == 1 else None
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from types import FrameType
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+
+PROFILE_HEADER = b"x-profile"
+
+# Set while a profiled request runs, so work it hands off to the scheduler is profiled too.
+profiled_request: ContextVar[Optional[str]] = ContextVar("profiled_request", default=None)
+
+
+def describe_frame(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def get_coroutine_frame(awaitable) -> Optional[FrameType]:
+    for attribute in ("cr_frame", "ag_frame", "gi_frame"):
+        frame = getattr(awaitable, attribute, None)
+        if frame is not None:
+            return frame
+    return None
+
+
+def get_awaited(awaitable):
+    for attribute in ("cr_await", "ag_await", "gi_yieldfrom"):
+        awaited = getattr(awaitable, attribute, None)
+        if awaited is not None:
+            return awaited
+    return None
+
+
+class SamplingProfiler:
+    """Wall-clock sampling profiler for individual asyncio tasks, written out as folded stacks.
+
+    A sampler thread wakes every ``profiling_interval`` seconds while at least one task is being
+    profiled and it exits as soon as none is. For the task the event loop is running it records
+    the live stack; for a suspended task it walks the coroutines it is awaiting, so time spent
+    waiting on Postgres or Redis shows up too. Each profile is written to ``profiling_directory``
+    as a ``.folded`` file that flamegraph.pl, speedscope or inferno can render.
+    """
+
+    tasks: dict[asyncio.Task, Counter] = {}
+    armed_requests: int = 0
+    sampler: Optional[threading.Thread] = None
+    lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def arm_requests(cls, count: int) -> None:
+        cls.armed_requests = count
+
+    @classmethod
+    def take_armed_request(cls) -> bool:
+        if cls.armed_requests <= 0:
+            return False
+        cls.armed_requests -= 1
+        return True
+
+    @classmethod
+    @asynccontextmanager
+    async def profile(cls, name: str) -> AsyncIterator[None]:
+        """Profile the current task until the block exits, then write ``<timestamp>-<name>.folded``."""
+        loop = asyncio.get_running_loop()
+        task: asyncio.Task = asyncio.current_task()
+        samples: Counter = Counter()
+        with cls.lock:
+            cls.tasks[task] = samples
+            if cls.sampler is None:
+                cls.sampler = threading.Thread(
+                    target=cls.sample, args=(loop, threading.get_ident()), name="sampling-profiler", daemon=True
+                )
+                cls.sampler.start()
+        try:
+            yield
+        finally:
+            with cls.lock:
+                cls.tasks.pop(task, None)
+            try:
+                path: str = await run_in_threadpool(cls.write_folded, name, samples)
+                logging.info(f"Wrote profile of {name} to {path}")
+            except OSError as os_error:
+                logging.error(f"Could not write profile of {name}: {os_error}")
+
+    @staticmethod
+    def profiled(name: str, job: Callable[[], Awaitable[None]]) -> Callable[[], Awaitable[None]]:
+        async def run_profiled() -> None:
+            async with SamplingProfiler.profile(name):
+                await job()
+
+        return run_profiled
+
+    @classmethod
+    def sample(cls, loop: asyncio.AbstractEventLoop, loop_thread_id: int) -> None:
+        while True:
+            time.sleep(settings.profiling_interval)
+            with cls.lock:
+                if not cls.tasks:
+                    cls.sampler = None
+                    return
+                running: Optional[asyncio.Task] = asyncio.tasks._current_tasks.get(loop)
+                for task, samples in cls.tasks.items():
+                    if task is running:
+                        stack: list[str] = cls.get_running_stack(task, sys._current_frames().get(loop_thread_id))
+                    else:
+                        stack = cls.get_suspended_stack(task)
+                    if stack:
+                        samples[";".join(stack)] += 1
+
+    @staticmethod
+    def get_running_stack(task: asyncio.Task, frame: Optional[FrameType]) -> list[str]:
+        """Live stack of the running task, from its coroutine down, leaving out the event loop frames."""
+        top: Optional[FrameType] = get_coroutine_frame(task.get_coro())
+        stack: list[str] = []
+        while frame is not None:
+            stack.append(describe_frame(frame))
+            if frame is top:
+                break
+            frame = frame.f_back
+        return stack[::-1]
+
+    @staticmethod
+    def get_suspended_stack(task: asyncio.Task) -> list[str]:
+        stack: list[str] = []
+        awaitable = task.get_coro()
+        while awaitable is not None:
+            frame: Optional[FrameType] = get_coroutine_frame(awaitable)
+            if frame is None:
+                break
+            stack.append(describe_frame(frame))
+            awaitable = get_awaited(awaitable)
+        if stack:
+            stack.append("(awaiting)")
+        return stack
+
+    @staticmethod
+    def write_folded(name: str, samples: Counter) -> str:
+        os.makedirs(settings.profiling_directory, exist_ok=True)
+        safe_name: str = re.sub(r"[^A-Za-z0-9_.-]+", "_", name).strip("_")
+        file_name: str = f"{datetime.now().strftime('%Y%m%dT%H%M%S.%f')}-{safe_name}.folded"
+        path: str = os.path.join(settings.profiling_directory, file_name)
+        with open(path, "w") as folded:
+            for stack, count in samples.most_common():
+                folded.write(f"{stack} {count}\n")
+        return path
+
+    @staticmethod
+    def list_profiles() -> list[str]:
+        if not os.path.isdir(settings.profiling_directory):
+            return []
+        return sorted(name for name in os.listdir(settings.profiling_directory) if name.endswith(".folded"))
+
+
+class ProfilingMiddleware:
+    """Profiles ``/interrupt/*`` requests sent with ``X-Profile: 1`` or armed through the admin endpoint.
+
+    Only installed when ``profiling_enabled`` is set. It is plain ASGI rather than
+    ``BaseHTTPMiddleware`` so the endpoint runs in the task that gets profiled.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/interrupt/"):
+            await self.app(scope, receive, send)
+            return
+        requested: bool = dict(scope["headers"]).get(PROFILE_HEADER, b"") not in (b"", b"0")
+        if not requested and not SamplingProfiler.take_armed_request():
+            await self.app(scope, receive, send)
+            return
+        name: str = f"{scope['method']}{scope['path']}"
+        token = profiled_request.set(name)
+        try:
+            async with SamplingProfiler.profile(name):
+                await self.app(scope, receive, send)
+        finally:
+            profiled_request.reset(token)
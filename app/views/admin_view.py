@@ -0,0 +1,56 @@
+from fastapi import APIRouter, Query
+
+from app.config import settings
+from app.models.response.default_response_model import DefaultResponseModel
+from app.utils.profiler_utils import SamplingProfiler
+
+admin_view: APIRouter = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+)
+
+
+def profiling_disabled_response() -> DefaultResponseModel:
+    return DefaultResponseModel(
+        message="Profiling is disabled, set PROFILING_ENABLED to use it",
+        status="error",
+        status_code=403,
+        data=None,
+    )
+
+
+@admin_view.post(
+    "/profiling",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def arm_profiling(requests: int = Query(default=1, ge=0, le=100)):
+    if not settings.profiling_enabled:
+        return profiling_disabled_response()
+    SamplingProfiler.arm_requests(requests)
+    return DefaultResponseModel(
+        message=f"Profiling the next {requests} /interrupt requests",
+        status="success",
+        status_code=200,
+        data={"armed_requests": requests, "directory": settings.profiling_directory},
+    )
+
+
+@admin_view.get(
+    "/profiling",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def get_profiles():
+    if not settings.profiling_enabled:
+        return profiling_disabled_response()
+    return DefaultResponseModel(
+        message="Written profiles",
+        status="success",
+        status_code=200,
+        data={
+            "armed_requests": SamplingProfiler.armed_requests,
+            "directory": settings.profiling_directory,
+            "profiles": SamplingProfiler.list_profiles(),
+        },
+    )
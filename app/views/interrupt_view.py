@@ -1,13 +1,22 @@
+from typing import Optional
+from uuid import UUID
+
 from aredis_om import NotFoundError
-from fastapi import APIRouter, UploadFile
+from fastapi import APIRouter, Header, Query, UploadFile
 from redis import AuthenticationError
 from redis.exceptions import AuthorizationError
 from redis.exceptions import ConnectionError as RedisConnectionError
 from redis.exceptions import TimeoutError as RedisTimeoutError
+from starlette import status
+from starlette.responses import JSONResponse
 
+from app.config import settings
 from app.controller.interrupt_controller import InterruptController
 from app.exception.base_alchemy_exception import BaseAlchemyException
 from app.exception.base_redis_om_error import BaseRedisOmError
+from app.exception.range_not_satisfiable_error import RangeNotSatisfiableError
+from app.exception.upload_scheduler_full_error import UploadSchedulerFullError
+from app.models.request.bulk_upload_request_model import BulkUploadRequestModel
 from app.models.response.default_response_model import DefaultResponseModel
 
 interrupt_view: APIRouter = APIRouter(
@@ -16,6 +25,18 @@ interrupt_view: APIRouter = APIRouter(
 )
 
 
+def upload_scheduler_full_response(upload_scheduler_error: UploadSchedulerFullError) -> JSONResponse:
+    return JSONResponse(
+        content=DefaultResponseModel(
+            message=upload_scheduler_error.args[0],
+            status="error",
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        ).dict(exclude_none=True),
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        headers={"Retry-After": str(settings.upload_admission_retry_after)},
+    )
+
+
 @interrupt_view.post(
     "/upload_file",
     response_model=DefaultResponseModel,
@@ -32,6 +53,8 @@ async def upload_file(file: UploadFile):
     try:
         response: DefaultResponseModel = await InterruptController.upload_file(file)
         return response
+    except UploadSchedulerFullError as upload_scheduler_error:
+        return upload_scheduler_full_response(upload_scheduler_error)
     except BaseAlchemyException as base_alchemy_error:
         return DefaultResponseModel(
             message=base_alchemy_error.args[0],
@@ -77,10 +100,27 @@ async def kill_file_upload(upload_id: str):
     response_model=DefaultResponseModel,
     response_model_exclude_none=True,
 )
-async def get_pending_file_uploads():
+async def get_pending_file_uploads(
+    page_size: int = Query(default=50, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    file_name: Optional[str] = None,
+    older_than_seconds: Optional[float] = Query(default=None, gt=0),
+):
     try:
-        response: DefaultResponseModel = await InterruptController.get_all_pending_file_upload()
+        response: DefaultResponseModel = await InterruptController.get_all_pending_file_upload(
+            page_size=page_size,
+            cursor=cursor,
+            file_name=file_name,
+            older_than_seconds=older_than_seconds,
+        )
         return response
+    except ValueError:
+        return DefaultResponseModel(
+            message="Invalid cursor, pass the next_cursor of the previous page",
+            status="error",
+            status_code=400,
+            data=None,
+        )
     except (
         RedisTimeoutError,
         AuthenticationError,
@@ -105,6 +145,8 @@ async def resume_upload(upload_id: str):
     try:
         response: DefaultResponseModel = await InterruptController.resume_upload(upload_id=upload_id)
         return response
+    except UploadSchedulerFullError as upload_scheduler_error:
+        return upload_scheduler_full_response(upload_scheduler_error)
     except (
         RedisTimeoutError,
         AuthenticationError,
@@ -141,3 +183,146 @@ async def stop_upload(upload_id: str):
             status_code=500,
             data=None,
         )
+
+
+@interrupt_view.post(
+    "/bulk/kill",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def bulk_kill_file_upload(request: BulkUploadRequestModel):
+    try:
+        response: DefaultResponseModel = await InterruptController.bulk_kill_file_upload(request)
+        return response
+    except (
+        RedisTimeoutError,
+        AuthenticationError,
+        AuthorizationError,
+        RedisConnectionError,
+        BaseRedisOmError,
+    ) as base_redis_error:
+        return DefaultResponseModel(
+            message=base_redis_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+
+
+@interrupt_view.post(
+    "/bulk/resume",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def bulk_resume_upload(request: BulkUploadRequestModel):
+    try:
+        response: DefaultResponseModel = await InterruptController.bulk_resume_upload(request)
+        return response
+    except BaseAlchemyException as base_alchemy_error:
+        return DefaultResponseModel(
+            message=base_alchemy_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+    except (
+        RedisTimeoutError,
+        AuthenticationError,
+        AuthorizationError,
+        RedisConnectionError,
+        BaseRedisOmError,
+    ) as base_redis_error:
+        return DefaultResponseModel(
+            message=base_redis_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+
+
+@interrupt_view.post(
+    "/bulk/stop",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def bulk_stop_upload(request: BulkUploadRequestModel):
+    try:
+        response: DefaultResponseModel = await InterruptController.bulk_stop_upload(request)
+        return response
+    except BaseAlchemyException as base_alchemy_error:
+        return DefaultResponseModel(
+            message=base_alchemy_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+    except (
+        RedisTimeoutError,
+        AuthenticationError,
+        AuthorizationError,
+        RedisConnectionError,
+        BaseRedisOmError,
+    ) as base_redis_error:
+        return DefaultResponseModel(
+            message=base_redis_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+
+
+@interrupt_view.get(
+    "/status/{upload_id}",
+    response_model=DefaultResponseModel,
+    response_model_exclude_none=True,
+)
+async def get_upload_status(upload_id: UUID):
+    try:
+        response: DefaultResponseModel = await InterruptController.get_upload_status(str(upload_id))
+        return response
+    except BaseAlchemyException as base_alchemy_error:
+        return DefaultResponseModel(
+            message=base_alchemy_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+    except (
+        RedisTimeoutError,
+        AuthenticationError,
+        AuthorizationError,
+        RedisConnectionError,
+        BaseRedisOmError,
+    ) as base_redis_error:
+        return DefaultResponseModel(
+            message=base_redis_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
+
+
+@interrupt_view.get(
+    "/file/{upload_id}",
+    response_model=None,
+)
+async def download_file(upload_id: UUID, range_header: Optional[str] = Header(default=None, alias="Range")):
+    try:
+        return await InterruptController.download_file(str(upload_id), range_header)
+    except RangeNotSatisfiableError as range_error:
+        return JSONResponse(
+            content=DefaultResponseModel(
+                message=range_error.args[0],
+                status="error",
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            ).dict(exclude_none=True),
+            status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+            headers={"Content-Range": f"bytes */{range_error.content_length}"},
+        )
+    except BaseAlchemyException as base_alchemy_error:
+        return DefaultResponseModel(
+            message=base_alchemy_error.args[0],
+            status="error",
+            status_code=500,
+            data=None,
+        )
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+import signal
+import socket
+
+from aredis_om import NotFoundError
+
+from app.config import settings
+from app.controller.interrupt_controller import InterruptController
+from app.crud.cache.interrupt_cache import InterruptCache
+from app.crud.cache.upload_lease import UploadLease
+from app.crud.cache.upload_queue import UploadQueue
+from app.crud.cache.upload_signal import UploadSignal
+from app.crud.database import database
+from app.crud.storage import chunk_storage
+from app.exception.invalid_status_transition_error import InvalidStatusTransitionError
+
+
+class UploadWorker:
+    """Consumes upload jobs from the Redis Stream and writes their chunks, outside the API process.
+
+    Each worker process runs ``concurrency`` consumers under one consumer name. Start as many
+    processes as the database can absorb; they share the work through the consumer group. On SIGTERM
+    or SIGINT running uploads stop at their next batch boundary and their jobs stay pending, so
+    another worker resumes them from the committed cursor. A job that keeps failing is given up on
+    once it has been delivered ``upload_stream_max_deliveries`` times.
+    """
+
+    def __init__(self, concurrency: int, consumer: str):
+        self.concurrency: int = concurrency
+        self.consumer: str = consumer
+        self.stopping: asyncio.Event = asyncio.Event()
+
+    async def run(self) -> None:
+        await UploadQueue.create_group()
+        UploadSignal.start_listener()
+        loop = asyncio.get_running_loop()
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(signal_number, self.stop)
+        logging.info(f"Upload worker {self.consumer} consuming {settings.upload_stream_name}")
+        try:
+            async with asyncio.TaskGroup() as task_group:
+                for _ in range(self.concurrency):
+                    task_group.create_task(self.consume())
+        finally:
+            await UploadSignal.stop_listener()
+            await chunk_storage.close()
+            await database.engine.dispose()
+
+    def stop(self) -> None:
+        logging.info(f"Upload worker {self.consumer} is shutting down")
+        self.stopping.set()
+        for unique_id in list(UploadSignal.interrupted):
+            UploadSignal.notify(unique_id)
+
+    async def consume(self) -> None:
+        while not self.stopping.is_set():
+            try:
+                claimed = await UploadQueue.claim_stale(self.consumer)
+                job = claimed or await UploadQueue.read(self.consumer)
+                if job is None or self.stopping.is_set():
+                    continue
+                job_id, unique_id = job
+                if claimed is not None:
+                    # Leased: the upload is being written, under this job or a duplicate of it, so the
+                    # claim is not a delivery. Its writer's worker claims the job back, or acknowledges it.
+                    if not await UploadLease.get_unleased([unique_id]):
+                        continue
+                    deliveries: int = await UploadQueue.redeliver(job_id, self.consumer)
+                    if deliveries > settings.upload_stream_max_deliveries:
+                        await self.give_up(job_id, unique_id, deliveries)
+                        continue
+                keeper: asyncio.Task = asyncio.create_task(self.keep_claimed(job_id))
+                try:
+                    finished: bool = await InterruptController.run_upload_job(unique_id)
+                finally:
+                    keeper.cancel()
+                if finished:
+                    await UploadQueue.acknowledge(job_id)
+            except Exception as exception:
+                logging.error(f"Upload worker {self.consumer} failed: {exception}")
+                await asyncio.sleep(settings.upload_stream_block_timeout)
+
+    async def keep_claimed(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(settings.upload_stream_claim_idle / 3)
+            try:
+                await UploadQueue.keep_claimed(job_id, self.consumer)
+            except Exception as exception:
+                logging.error(f"Upload worker {self.consumer} could not keep job {job_id} claimed: {exception}")
+
+    @staticmethod
+    async def give_up(job_id: str, unique_id: str, deliveries: int) -> None:
+        """Dead-letter a job whose upload has no writer and leave the upload killed.
+
+        A killed upload is listed as pending and can be resumed once whatever made it fail is fixed.
+        """
+        logging.error(f"Upload {unique_id} was not finished in {deliveries - 1} deliveries, marking it killed")
+        try:
+            await InterruptCache.update_interrupt_cache(unique_id, "killed")
+        except (NotFoundError, InvalidStatusTransitionError):
+            # Stopped or completed meanwhile.
+            pass
+        await UploadQueue.dead_letter(job_id, unique_id, deliveries)
+
+
+def get_consumer_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
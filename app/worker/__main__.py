@@ -0,0 +1,9 @@
+import asyncio
+import logging
+
+from app.config import settings
+from app.worker import UploadWorker, get_consumer_name
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.DEBUG if settings.debug else logging.INFO)
+    asyncio.run(UploadWorker(concurrency=settings.upload_max_workers, consumer=get_consumer_name()).run())
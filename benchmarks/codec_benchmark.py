@@ -0,0 +1,91 @@
+"""Compare the chunk codecs: CPU spent against bytes kept off Postgres, per chunk size.
+
+Run ``python -m benchmarks.codec_benchmark [FILE ...]``. Without files a synthetic log-like text
+sample is used. Compression runs once per chunk, exactly as the upload writers do, so small chunk
+sizes show the per-call overhead and the lost dictionary context.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.utils.codec_utils import decode_chunk, encode_chunk, get_available_codecs
+
+DEFAULT_CHUNK_SIZES = [4 * 1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024]
+
+
+def make_sample(size: int) -> bytes:
+    random.seed(0)
+    levels = ["INFO", "WARNING", "ERROR", "DEBUG"]
+    words = ["upload", "chunk", "resume", "killed", "cursor", "batch", "stream", "worker", "lease", "spool"]
+    lines: list[str] = []
+    length: int = 0
+    while length < size:
+        line = (
+            f"2026-10-18T{random.randrange(24):02}:{random.randrange(60):02}:{random.randrange(60):02}Z "
+            f"{random.choice(levels)} {' '.join(random.choices(words, k=random.randint(4, 14)))} "
+            f"id={random.getrandbits(64):016x} n={random.randint(0, 10 ** 6)}\n"
+        )
+        lines.append(line)
+        length += len(line)
+    return "".join(lines).encode("utf-8")[:size]
+
+
+def benchmark(data: bytes, codec: str, chunk_size: int, level: int | None) -> dict:
+    view = memoryview(data)
+    chunks: list[memoryview] = [view[start : start + chunk_size] for start in range(0, len(data), chunk_size)]
+    started: float = time.process_time()
+    encoded: list[bytes] = [encode_chunk(chunk, codec, level) for chunk in chunks]
+    compress_seconds: float = time.process_time() - started
+    started = time.process_time()
+    for body in encoded:
+        decode_chunk(body)
+    decompress_seconds: float = time.process_time() - started
+    stored: int = sum(len(body) for body in encoded)
+    megabytes: float = len(data) / (1024 * 1024)
+    return {
+        "codec": codec,
+        "level": level,
+        "chunk_size": chunk_size,
+        "ratio": round(len(data) / stored, 2),
+        "stored_bytes": stored,
+        "saved_bytes": len(data) - stored,
+        "compress_mb_per_second": round(megabytes / compress_seconds, 1) if compress_seconds else None,
+        "decompress_mb_per_second": round(megabytes / decompress_seconds, 1) if decompress_seconds else None,
+        "compress_cpu_ms_per_mb": round(compress_seconds * 1000 / megabytes, 2),
+        "decompress_cpu_ms_per_mb": round(decompress_seconds * 1000 / megabytes, 2),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("files", nargs="*", help="text files to compress; a synthetic sample when omitted")
+    parser.add_argument("--sample-size", type=int, default=32 * 1024 * 1024, help="bytes of synthetic text")
+    parser.add_argument("--chunk-size", type=int, action="append", dest="chunk_sizes", help="repeatable")
+    parser.add_argument("--codec", action="append", dest="codecs", choices=get_available_codecs(), help="repeatable")
+    parser.add_argument("--level", type=int, default=None, help="codec level; each codec's default when omitted")
+    parser.add_argument("--json", action="store_true", help="print JSON lines instead of a table")
+    arguments = parser.parse_args()
+
+    data: bytes = b"".join(open(path, "rb").read() for path in arguments.files) or make_sample(arguments.sample_size)
+    results: list[dict] = [
+        benchmark(data, codec, chunk_size, arguments.level)
+        for codec in arguments.codecs or get_available_codecs()
+        for chunk_size in arguments.chunk_sizes or DEFAULT_CHUNK_SIZES
+    ]
+    if arguments.json:
+        for result in results:
+            print(json.dumps(result))
+        return
+    print(f"{len(data)} bytes of input")
+    print(f"{'codec':<6} {'chunk':>8} {'ratio':>7} {'comp MB/s':>10} {'decomp MB/s':>12} {'comp ms/MB':>11}")
+    for result in results:
+        print(
+            f"{result['codec']:<6} {result['chunk_size']:>8} {result['ratio']:>7} "
+            f"{result['compress_mb_per_second'] or '-':>10} {result['decompress_mb_per_second'] or '-':>12} "
+            f"{result['compress_cpu_ms_per_mb']:>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""Drive the real FastAPI app through upload, kill, resume and stop and report throughput and latency as JSON.
+
+Run ``python -m benchmarks.upload_benchmark --output results.json`` with ``DATABASE_URL`` and
+``REDIS_OM_URL`` pointing at a local Postgres and Redis Stack (the app needs RedisJSON and
+RediSearch). Requests go through the ASGI app in-process, so the numbers include routing,
+validation and serialisation but no network. Compare runs with ``diff`` or ``jq`` on the output;
+every run records the commit it was made on.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import subprocess
+import time
+import uuid
+from typing import Optional
+from urllib.parse import urlencode
+
+from app import app
+from app.config import settings
+from app.crud.cache.upload_lease import UploadLease
+
+DEFAULT_FILE_SIZES = [16 * 1024, 1024 * 1024, 8 * 1024 * 1024]
+DEFAULT_CONCURRENCY = [1, 4, 16]
+POLL_INTERVAL = 0.01
+# Every benchmark request comes from 127.0.0.1; a client id per upload keeps the per-client admission limit out of
+# the measurements.
+BENCHMARK_CLIENT_HEADER = "X-Benchmark-Client"
+COMPLETION_TIMEOUT = 600.0
+
+
+async def asgi_request(
+    method: str,
+    path: str,
+    query: Optional[dict] = None,
+    body: bytes = b"",
+    headers: Optional[dict[str, str]] = None,
+) -> tuple[int, dict]:
+    """Send one HTTP request straight to the ASGI app and return its status and decoded JSON body."""
+    request_sent: bool = False
+    response_status: int = 0
+    response_body: list[bytes] = []
+
+    async def receive() -> dict:
+        nonlocal request_sent
+        if request_sent:
+            # The app only asks again once the response is done; block like an idle client would.
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: dict) -> None:
+        nonlocal response_status
+        if message["type"] == "http.response.start":
+            response_status = message["status"]
+        elif message["type"] == "http.response.body":
+            response_body.append(message.get("body", b""))
+
+    scope: dict = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}).encode(),
+        "root_path": "",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        + [(b"content-length", str(len(body)).encode())],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    await app(scope, receive, send)
+    content: bytes = b"".join(response_body)
+    return response_status, json.loads(content) if content else {}
+
+
+def make_text(size: int, seed: int) -> bytes:
+    generator = random.Random(seed)
+    words = ["upload", "chunk", "resume", "killed", "cursor", "batch", "stream", "worker", "lease", "spool", "é"]
+    lines: list[str] = []
+    length: int = 0
+    while length < size:
+        line = " ".join(generator.choices(words, k=generator.randint(4, 16))) + "\n"
+        lines.append(line)
+        length += len(line.encode())
+    data: bytes = "".join(lines).encode()[:size]
+    # Cutting may split the last multibyte character; pad with ASCII instead.
+    return data.decode("utf-8", errors="ignore").encode().ljust(size, b"x")
+
+
+def make_multipart(data: bytes, file_name: str) -> tuple[bytes, str]:
+    boundary: str = uuid.uuid4().hex
+    body: bytes = (
+        (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{file_name}"\r\n'
+            "Content-Type: text/plain\r\n\r\n"
+        ).encode()
+        + data
+        + f"\r\n--{boundary}--\r\n".encode()
+    )
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+async def upload(data: bytes) -> tuple[float, Optional[str]]:
+    """Upload a file and return the request latency and its upload id (None when it was stored inline)."""
+    body, content_type = make_multipart(data, "benchmark.txt")
+    started: float = time.perf_counter()
+    headers: dict[str, str] = {"content-type": content_type}
+    if settings.upload_client_header:
+        headers[settings.upload_client_header] = uuid.uuid4().hex
+    _, response = await asgi_request("POST", "/interrupt/upload_file", body=body, headers=headers)
+    latency: float = time.perf_counter() - started
+    if response.get("status_code") != 200:
+        raise RuntimeError(f"Upload failed: {response}")
+    return latency, (response.get("data") or {}).get("unique_id")
+
+
+async def get_status(upload_id: str) -> dict:
+    _, response = await asgi_request("GET", f"/interrupt/status/{upload_id}")
+    return response.get("data") or {}
+
+
+async def wait_until(upload_id: str, predicate, timeout: float = COMPLETION_TIMEOUT) -> dict:
+    deadline: float = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        upload_status: dict = await get_status(upload_id)
+        if predicate(upload_status):
+            return upload_status
+        await asyncio.sleep(POLL_INTERVAL)
+    raise TimeoutError(f"Upload {upload_id} did not reach the expected state in {timeout}s")
+
+
+async def wait_for_writer_exit(upload_id: str, timeout: float = COMPLETION_TIMEOUT) -> None:
+    """Wait until no writer holds the upload's lease, which it releases when its task returns."""
+    deadline: float = time.perf_counter() + timeout
+    while not await UploadLease.get_unleased([upload_id]):
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"Writer of upload {upload_id} did not stop in {timeout}s")
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+def percentile(samples: list[float], fraction: float) -> Optional[float]:
+    if not samples:
+        return None
+    ordered: list[float] = sorted(samples)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+def summarize_latency(samples: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(samples, 0.50) * 1000, 3) if samples else None,
+        "p99_ms": round(percentile(samples, 0.99) * 1000, 3) if samples else None,
+        "max_ms": round(max(samples) * 1000, 3) if samples else None,
+    }
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS.
+    divisor: int = 1024 * 1024 if platform.system() == "Darwin" else 1024
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / divisor, 1)
+
+
+async def benchmark_uploads(file_size: int, concurrency: int, uploads: int) -> dict:
+    data: bytes = make_text(file_size, seed=file_size)
+    semaphore = asyncio.Semaphore(concurrency)
+    request_latencies: list[float] = []
+    completion_latencies: list[float] = []
+
+    async def run_one() -> None:
+        async with semaphore:
+            started: float = time.perf_counter()
+            latency, upload_id = await upload(data)
+            request_latencies.append(latency)
+            if upload_id is not None:
+                await wait_until(upload_id, lambda upload_status: upload_status.get("status") == "completed")
+            completion_latencies.append(time.perf_counter() - started)
+
+    started: float = time.perf_counter()
+    await asyncio.gather(*(run_one() for _ in range(uploads)))
+    elapsed: float = time.perf_counter() - started
+    return {
+        "scenario": "upload",
+        "file_size": file_size,
+        "concurrency": concurrency,
+        "uploads": uploads,
+        "elapsed_seconds": round(elapsed, 3),
+        "uploads_per_second": round(uploads / elapsed, 3),
+        "mb_per_second": round(uploads * file_size / elapsed / (1024 * 1024), 3),
+        "request_latency": summarize_latency(request_latencies),
+        "completion_latency": summarize_latency(completion_latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def benchmark_interrupts(file_size: int, rounds: int) -> dict:
+    """Kill each upload mid-way, resume it, then kill and stop it, timing every step."""
+    data: bytes = make_text(file_size, seed=file_size)
+    kill_latencies: list[float] = []
+    kill_to_stop_latencies: list[float] = []
+    resume_latencies: list[float] = []
+    stop_latencies: list[float] = []
+    for _ in range(rounds):
+        _, upload_id = await upload(data)
+        if upload_id is None:
+            raise ValueError("Interrupt benchmarks need files larger than UPLOAD_CHUNK_SIZE")
+        await wait_until(upload_id, lambda upload_status: upload_status.get("bytes_done", 0) > 0)
+
+        started: float = time.perf_counter()
+        await asgi_request("POST", f"/interrupt/kill/{upload_id}")
+        kill_latencies.append(time.perf_counter() - started)
+        await wait_for_writer_exit(upload_id)
+        kill_to_stop_latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asgi_request("GET", f"/interrupt/resume/{upload_id}")
+        resume_latencies.append(time.perf_counter() - started)
+
+        await asgi_request("POST", f"/interrupt/kill/{upload_id}")
+        await wait_for_writer_exit(upload_id)
+        started = time.perf_counter()
+        await asgi_request("DELETE", "/interrupt/stop", query={"upload_id": upload_id})
+        stop_latencies.append(time.perf_counter() - started)
+    return {
+        "scenario": "interrupt",
+        "file_size": file_size,
+        "rounds": rounds,
+        "kill_latency": summarize_latency(kill_latencies),
+        "kill_to_stop_latency": summarize_latency(kill_to_stop_latencies),
+        "resume_latency": summarize_latency(resume_latencies),
+        "stop_latency": summarize_latency(stop_latencies),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def get_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(arguments: argparse.Namespace) -> dict:
+    if not settings.upload_client_header:
+        settings.upload_client_header = BENCHMARK_CLIENT_HEADER
+    await app.router.startup()
+    try:
+        results: list[dict] = []
+        for file_size in arguments.file_sizes or DEFAULT_FILE_SIZES:
+            for concurrency in arguments.concurrency or DEFAULT_CONCURRENCY:
+                results.append(await benchmark_uploads(file_size, concurrency, arguments.uploads))
+                print(json.dumps(results[-1]))
+        if arguments.interrupt_rounds:
+            results.append(await benchmark_interrupts(arguments.interrupt_file_size, arguments.interrupt_rounds))
+            print(json.dumps(results[-1]))
+    finally:
+        await app.router.shutdown()
+    return {
+        "commit": get_commit(),
+        "label": arguments.label,
+        "started_at": arguments.started_at,
+        "python": platform.python_version(),
+        "settings": {
+            "upload_executor": settings.upload_executor,
+            "upload_chunk_size": settings.upload_chunk_size,
+            "upload_batch_size": settings.upload_batch_size,
+            "upload_batch_bytes": settings.upload_batch_bytes,
+            "upload_writers_per_file": settings.upload_writers_per_file,
+            "upload_max_workers": settings.upload_max_workers,
+            "upload_inflight_byte_budget": settings.upload_inflight_byte_budget,
+            "upload_compression": settings.upload_compression,
+            "upload_deduplicate_chunks": settings.upload_deduplicate_chunks,
+            "database_pool_size": settings.database_pool_size,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--file-size", type=int, action="append", dest="file_sizes", help="bytes; repeatable")
+    parser.add_argument("--concurrency", type=int, action="append", help="concurrent uploads; repeatable")
+    parser.add_argument("--uploads", type=int, default=16, help="uploads per file size and concurrency level")
+    parser.add_argument("--interrupt-rounds", type=int, default=5, help="kill/resume/stop rounds; 0 to skip")
+    parser.add_argument("--interrupt-file-size", type=int, default=64 * 1024 * 1024, help="bytes")
+    parser.add_argument("--label", default=None, help="free-form tag stored with the results")
+    parser.add_argument("--output", default=None, help="write the JSON report here as well as printing it")
+    arguments = parser.parse_args()
+    arguments.started_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+    report: dict = asyncio.run(run(arguments))
+    if arguments.output:
+        with open(arguments.output, "w") as output:
+            json.dump(report, output, indent=2)
+
+
+if __name__ == "__main__":
+    main()
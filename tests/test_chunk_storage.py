@@ -0,0 +1,90 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from app.crud.storage.filesystem_chunk_storage import FilesystemChunkStorage
+from app.crud.storage.memory_chunk_storage import MemoryChunkStorage
+
+FILE_ID = "0b6f8a52-2a4e-4c1b-9d0e-3f2f3f1b7a10"
+
+
+def make_rows(first_chunk_seq: int, locations: list[dict]) -> list[SimpleNamespace]:
+    return [
+        SimpleNamespace(
+            file_id=FILE_ID,
+            chunk_seq=first_chunk_seq + index,
+            storage_segment=location.get("storage_segment"),
+            storage_offset=location.get("storage_offset"),
+            stored_length=location.get("stored_length"),
+        )
+        for index, location in enumerate(locations)
+    ]
+
+
+def test_memory_storage_write_read_delete():
+    storage = MemoryChunkStorage()
+    bodies = [b"first", b"second", b"third"]
+    rows = make_rows(3, asyncio.run(storage.write_chunks(FILE_ID, 3, bodies)))
+
+    assert [storage.read_chunk(row) for row in rows] == bodies
+
+    storage.delete_chunks(rows[:2])
+    assert storage.read_chunk(rows[2]) == b"third"
+    with pytest.raises(LookupError):
+        storage.read_chunk(rows[0])
+
+
+def test_filesystem_storage_write_read_across_segments(tmp_path):
+    storage = FilesystemChunkStorage(str(tmp_path), segment_size=64, fsync_delay=0.0, reclaim_delay=0.0)
+    batches = [[bytes([65 + batch]) * 10, bytes([97 + batch]) * 15] for batch in range(8)]
+
+    async def write() -> list[SimpleNamespace]:
+        rows: list[SimpleNamespace] = []
+        for batch in batches:
+            rows += make_rows(len(rows), await storage.write_chunks(FILE_ID, len(rows), batch))
+        await storage.close()
+        return rows
+
+    rows = asyncio.run(write())
+    bodies = [body for batch in batches for body in batch]
+
+    assert len(os.listdir(tmp_path)) > 1
+    assert all(len({row.storage_segment for row in rows[index : index + 2]}) == 1 for index in range(0, len(rows), 2))
+    assert [storage.read_chunk(row) for row in rows] == bodies
+    # Another process sharing the directory reads the same chunks from the rows alone.
+    reader = FilesystemChunkStorage(str(tmp_path), segment_size=64, fsync_delay=0.0, reclaim_delay=0.0)
+    assert [reader.read_chunk(row) for row in rows] == bodies
+
+
+def test_filesystem_storage_reclaims_only_sealed_segments(tmp_path):
+    storage = FilesystemChunkStorage(str(tmp_path), segment_size=16, fsync_delay=0.0, reclaim_delay=0.0)
+
+    async def write() -> list[SimpleNamespace]:
+        sealed = make_rows(0, await storage.write_chunks(FILE_ID, 0, [b"x" * 12]))
+        current = make_rows(1, await storage.write_chunks(FILE_ID, 1, [b"y" * 12]))
+        return sealed + current
+
+    rows = asyncio.run(write())
+    sealed_segment, current_segment = rows[0].storage_segment, rows[1].storage_segment
+
+    storage.delete_chunks(rows)
+    assert storage.get_reclaimable_segments() == [sealed_segment]
+    storage.delete_segments([sealed_segment])
+    assert os.listdir(tmp_path) == [current_segment]
+
+    # The segment still open for appends qualifies once its writer has closed it.
+    asyncio.run(storage.close())
+    assert storage.get_reclaimable_segments() == [current_segment]
+
+
+def test_filesystem_storage_waits_for_recently_written_segments(tmp_path):
+    writer = FilesystemChunkStorage(str(tmp_path), segment_size=16, fsync_delay=0.0, reclaim_delay=3600.0)
+    rows = make_rows(0, asyncio.run(writer.write_chunks(FILE_ID, 0, [b"z" * 12])))
+    asyncio.run(writer.close())
+
+    writer.delete_chunks(rows)
+
+    assert writer.get_reclaimable_segments() == []
+    assert writer.emptied_segments == {rows[0].storage_segment}
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from app.utils.codec_utils import (
+    CODEC_IDS,
+    decode_chunk,
+    encode_chunk,
+    get_available_codecs,
+)
+
+TEXT = ("resumable uploads are stored in chunks. " * 200).encode()
+
+
+@pytest.mark.parametrize("codec", get_available_codecs())
+def test_round_trip(codec):
+    stored = encode_chunk(TEXT, codec)
+
+    assert decode_chunk(stored) == TEXT
+    assert stored[0] == CODEC_IDS[codec]
+
+
+@pytest.mark.parametrize("codec", get_available_codecs())
+def test_round_trip_from_memoryview(codec):
+    assert decode_chunk(encode_chunk(memoryview(TEXT)[10:500], codec)) == TEXT[10:500]
+
+
+def test_incompressible_chunks_are_stored_uncompressed():
+    data = os.urandom(1024)
+    stored = encode_chunk(data, "zlib")
+
+    assert stored[0] == CODEC_IDS["none"]
+    assert decode_chunk(stored) == data
+
+
+def test_unsupported_codecs_are_rejected():
+    with pytest.raises(ValueError):
+        encode_chunk(TEXT, "brotli")
+    with pytest.raises(ValueError):
+        decode_chunk(bytes((255,)) + TEXT)
@@ -0,0 +1,126 @@
+import asyncio
+import random
+
+import pytest
+
+from app.exception.range_not_satisfiable_error import RangeNotSatisfiableError
+from app.utils.function_utils import (
+    iter_chunk_batches,
+    iter_spool_chunks,
+    parse_byte_range,
+)
+
+WORDS = ["upload", "chunk", "resume", "cursor", "é", "日本語", "🙂", "spool"]
+
+
+def make_text(lines: int, seed: int = 0) -> bytes:
+    generator = random.Random(seed)
+    return "".join(" ".join(generator.choices(WORDS, k=generator.randint(2, 12))) + "\n" for _ in range(lines)).encode()
+
+
+def collect_chunks(
+    path, chunk_size: int, byte_cursor: int = 0, content_defined: bool = False
+) -> list[tuple[int, bytes]]:
+    async def collect() -> list[tuple[int, bytes]]:
+        return [
+            (offset, bytes(chunk))
+            async for offset, chunk in iter_spool_chunks(str(path), chunk_size, byte_cursor, content_defined)
+        ]
+
+    return asyncio.run(collect())
+
+
+@pytest.mark.parametrize("chunk_size", [4, 5, 7, 64, 1000])
+def test_spool_chunks_cover_the_file_on_utf8_boundaries(tmp_path, chunk_size):
+    data = make_text(200)
+    path = tmp_path / "spool"
+    path.write_bytes(data)
+
+    chunks = collect_chunks(path, chunk_size)
+
+    assert b"".join(chunk for _, chunk in chunks) == data
+    offset = 0
+    for chunk_offset, chunk in chunks:
+        assert chunk_offset == offset
+        assert 0 < len(chunk) <= chunk_size
+        chunk.decode("utf-8")
+        offset += len(chunk)
+
+
+def test_spool_chunks_resume_with_the_same_boundaries(tmp_path):
+    path = tmp_path / "spool"
+    path.write_bytes(make_text(200))
+    chunks = collect_chunks(path, 37)
+
+    byte_cursor = chunks[10][0]
+    assert collect_chunks(path, 37, byte_cursor) == chunks[10:]
+
+
+def test_spool_chunks_read_in_several_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr("app.utils.function_utils.settings.upload_read_block_size", 16)
+    data = make_text(100)
+    path = tmp_path / "spool"
+    path.write_bytes(data)
+
+    chunks = collect_chunks(path, 7)
+
+    assert b"".join(chunk for _, chunk in chunks) == data
+    assert all(chunk.decode("utf-8") for _, chunk in chunks)
+
+
+def test_content_defined_chunks_end_on_lines_and_survive_an_insertion(tmp_path):
+    data = make_text(5000)
+    original = tmp_path / "original"
+    original.write_bytes(data)
+    edited = tmp_path / "edited"
+    edited.write_bytes(b"a line inserted at the start\n" + data)
+
+    chunks = collect_chunks(original, 4096, content_defined=True)
+    edited_chunks = collect_chunks(edited, 4096, content_defined=True)
+
+    assert b"".join(chunk for _, chunk in chunks) == data
+    # A chunk ends after a line unless it reached the maximum size first, less a cut multibyte character.
+    assert all(chunk.endswith(b"\n") or len(chunk) > 4096 - 4 for _, chunk in chunks)
+    assert all(len(chunk) <= 4096 for _, chunk in chunks)
+    assert sum(chunk.endswith(b"\n") for _, chunk in chunks) > len(chunks) // 2
+    # Only the chunks around the edit change; fixed-size chunks would all shift.
+    unchanged = {chunk for _, chunk in chunks} & {chunk for _, chunk in edited_chunks}
+    assert len(unchanged) >= len(chunks) - 2
+
+
+def test_chunk_batches_are_bounded_by_count_and_bytes():
+    async def chunks():
+        for size in [3, 3, 3, 10, 1, 1, 1, 1, 1]:
+            yield 0, memoryview(b"x" * size)
+
+    async def collect() -> list[list[int]]:
+        return [[len(chunk) for _, chunk in batch] async for batch in iter_chunk_batches(chunks(), 4, 8)]
+
+    assert asyncio.run(collect()) == [[3, 3], [3], [10], [1, 1, 1, 1], [1]]
+
+
+@pytest.mark.parametrize(
+    "range_header, expected",
+    [
+        (None, None),
+        ("", None),
+        ("items=0-1", None),
+        ("bytes=0-1,4-5", None),
+        ("bytes=5-2", None),
+        ("bytes=a-b", None),
+        ("bytes=0-9", (0, 9)),
+        ("bytes=2-4", (2, 4)),
+        ("bytes=5-", (5, 9)),
+        ("bytes=0-100", (0, 9)),
+        ("bytes=-3", (7, 9)),
+        ("bytes=-100", (0, 9)),
+    ],
+)
+def test_parse_byte_range(range_header, expected):
+    assert parse_byte_range(range_header, 10) == expected
+
+
+@pytest.mark.parametrize("range_header", ["bytes=10-", "bytes=20-30", "bytes=-0"])
+def test_parse_byte_range_not_satisfiable(range_header):
+    with pytest.raises(RangeNotSatisfiableError):
+        parse_byte_range(range_header, 10)
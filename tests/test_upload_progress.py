@@ -0,0 +1,24 @@
+from app.controller.upload_progress import UploadProgress
+
+
+def test_cursor_waits_for_earlier_batches():
+    progress = UploadProgress(0, 0)
+
+    assert not progress.commit(4, 6, 600)
+    assert not progress.commit(2, 4, 400)
+    assert (progress.chunk_cursor, progress.byte_cursor) == (0, 0)
+
+    assert progress.commit(0, 2, 200)
+    assert (progress.chunk_cursor, progress.byte_cursor) == (6, 600)
+    assert progress.committed == {}
+
+
+def test_cursor_stops_at_a_gap():
+    progress = UploadProgress(10, 1000)
+
+    assert progress.commit(10, 12, 1200)
+    assert not progress.commit(14, 16, 1600)
+    assert (progress.chunk_cursor, progress.byte_cursor) == (12, 1200)
+
+    assert progress.commit(12, 14, 1400)
+    assert (progress.chunk_cursor, progress.byte_cursor) == (16, 1600)